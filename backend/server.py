@@ -1,23 +1,94 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Query, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, Field
+from pymongo import ASCENDING, GEOSPHERE, TEXT, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 import os
 from dotenv import load_dotenv
 from typing import Optional, List, Dict, Any
 import google.generativeai as genai
-from github import Github
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+import typer
 import httpx
+import orjson
 import json
+import csv
 import uuid
-from datetime import datetime
+import base64
+import time
+import hashlib
+import gzip
+import logging
+import socket
+from collections import OrderedDict, defaultdict
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import asyncio
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="YazWho Empire Dashboard", version="2.0.0")
+logger = logging.getLogger("yazwho_empire")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks for shared resources"""
+    await ensure_indexes()
+    await musicjam_prober.start()
+    if github_client:
+        await github_client.start()
+    await job_workers.start()
+    await change_feed.start()
+    periodic_tasks = [
+        asyncio.create_task(run_periodically(
+            "refresh_collection_versions", COLLECTION_VERSION_REFRESH_SECONDS, refresh_collection_versions
+        )),
+        asyncio.create_task(run_periodically(
+            "reconcile_counters", COUNTERS_RECONCILE_INTERVAL_SECONDS,
+            run_exclusively("reconcile_counters", 2 * COUNTERS_RECONCILE_INTERVAL_SECONDS, reconcile_counters)
+        )),
+        asyncio.create_task(run_periodically(
+            "sweep_jam_session_statuses", JAM_SESSION_SWEEP_INTERVAL_SECONDS, sweep_jam_session_statuses
+        )),
+        asyncio.create_task(run_periodically(
+            "refresh_analytics", ANALYTICS_REFRESH_INTERVAL_SECONDS,
+            run_exclusively("refresh_analytics", 2 * ANALYTICS_REFRESH_INTERVAL_SECONDS, refresh_analytics)
+        )),
+    ]
+    yield
+    for task in periodic_tasks:
+        task.cancel()
+    await asyncio.gather(*periodic_tasks, return_exceptions=True)
+    await job_workers.stop()
+    await change_feed.stop()
+    await musicjam_prober.stop()
+    if github_client:
+        await github_client.stop()
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight to bytes with orjson.
+
+    List handlers return Mongo documents through this class directly, which skips
+    the jsonable_encoder walk and stdlib json pass FastAPI would otherwise make.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # Mongo hands datetimes back naive; they are UTC
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+
+def page_response(response: Response, **content) -> FastJSONResponse:
+    """Return a list page as-is, keeping headers set by dependencies such as conditional_get"""
+    return FastJSONResponse(content, headers=dict(response.headers))
+
+app = FastAPI(
+    title="YazWho Empire Dashboard",
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -28,9 +99,110 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Metrics
+# Prometheus instruments in a dedicated registry, served at /api/metrics. Latencies
+# are histograms so p50/p95/p99 come from histogram_quantile() when querying; values
+# are per process. Routes are labelled by their template, never the raw path.
+metrics_registry = CollectorRegistry()
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS, registry=metrics_registry
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"], registry=metrics_registry
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ["collection", "command"], buckets=LATENCY_BUCKETS, registry=metrics_registry
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands", ["collection", "command"], registry=metrics_registry
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to Gemini, GitHub and the MusicJam probe",
+    ["service", "operation"], buckets=LATENCY_BUCKETS, registry=metrics_registry
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed upstream calls by error type or HTTP status",
+    ["service", "operation", "error"], registry=metrics_registry
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each request until its response is fully sent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(time.perf_counter() - started)
+
+app.add_middleware(MetricsMiddleware)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records driver-measured command durations per collection"""
+    IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+    def __init__(self):
+        self._collections: Dict[tuple, str] = {}
+
+    def started(self, event):
+        if event.command_name in self.IGNORED_COMMANDS:
+            return
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        target = event.command.get(key)
+        self._collections[(event.request_id, event.connection_id)] = target if isinstance(target, str) else "-"
+
+    def _observe(self, event, failed: bool):
+        collection = self._collections.pop((event.request_id, event.connection_id), None)
+        if collection is None:
+            return
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        if failed:
+            MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+    def succeeded(self, event):
+        self._observe(event, failed=False)
+
+    def failed(self, event):
+        self._observe(event, failed=True)
+
+@contextmanager
+def observe_upstream(service: str, operation: str):
+    """Time an upstream call, counting exceptions (not cancellation) as errors"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        UPSTREAM_ERRORS.labels(service, operation, type(e).__name__).inc()
+        raise
+    finally:
+        UPSTREAM_DURATION.labels(service, operation).observe(time.perf_counter() - started)
+
 # Database connection
 MONGO_URL = os.getenv("MONGO_URL")
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(MONGO_URL, event_listeners=[MongoCommandMetrics()])
 db = client.yazwho_empire
 
 # API Keys
@@ -43,10 +215,410 @@ GOOGLE_OAUTH_CLIENT_SECRET = os.getenv("GOOGLE_OAUTH_CLIENT_SECRET")
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
-# Initialize GitHub
+# GitHub client settings
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_CACHE_TTL_SECONDS = float(os.getenv("GITHUB_CACHE_TTL_SECONDS", "60"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+GITHUB_MAX_BACKOFF_SECONDS = float(os.getenv("GITHUB_MAX_BACKOFF_SECONDS", "30"))
+
+class GitHubRateLimited(Exception):
+    """Raised when the GitHub rate limit is exhausted and no cached response exists"""
+
+class AsyncGitHubClient:
+    """Pooled async GitHub REST client with conditional requests and rate-limit backoff.
+
+    Responses are cached with their ETag. Within ``cache_ttl`` a cached response is
+    served without any request; after that it is revalidated with If-None-Match, and
+    304 responses do not count against the rate limit. When the limit is exhausted
+    the client serves stale data if it has any, otherwise waits for the reset.
+    """
+
+    def __init__(self, token: str, base_url: str, cache_ttl: float, max_retries: int,
+                 max_backoff: float, max_entries: int = 256):
+        self.token = token
+        self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.max_entries = max_entries
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.rate_limit: Dict[str, Optional[int]] = {"limit": None, "remaining": None, "reset": None}
+        self.stats = {"requests": 0, "fresh_hits": 0, "not_modified": 0, "stale_served": 0, "retries": 0}
+
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+
+    async def stop(self):
+        if self._client:
+            await self._client.aclose()
+
+    def _update_rate_limit(self, headers: httpx.Headers):
+        for name in ("limit", "remaining", "reset"):
+            value = headers.get(f"X-RateLimit-{name.title()}")
+            if value is not None:
+                self.rate_limit[name] = int(value)
+
+    def _backoff_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            return float(retry_after)
+        if self.rate_limit["remaining"] == 0 and self.rate_limit["reset"]:
+            return max(self.rate_limit["reset"] - time.time(), 0) + 1
+        return 2 ** attempt
+
+    def _remember(self, key: str, response: httpx.Response, data: Any):
+        self._cache[key] = {
+            "etag": response.headers.get("ETag"),
+            "data": data,
+            "fetched_at": time.time(),
+        }
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        cached = self._cache.get(key)
+        if cached and time.time() - cached["fetched_at"] < self.cache_ttl:
+            self.stats["fresh_hits"] += 1
+            return cached["data"]
+
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+        for attempt in range(self.max_retries + 1):
+            self.stats["requests"] += 1
+            with observe_upstream("github", path):
+                response = await self._client.get(path, params=params, headers=headers)
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.labels("github", path, f"http_{response.status_code}").inc()
+            self._update_rate_limit(response.headers)
+
+            if response.status_code == 304 and cached:
+                self.stats["not_modified"] += 1
+                cached["fetched_at"] = time.time()
+                return cached["data"]
+
+            rate_limited = response.status_code == 429 or (
+                response.status_code == 403
+                and (self.rate_limit["remaining"] == 0 or "Retry-After" in response.headers)
+            )
+            if rate_limited or response.status_code >= 500:
+                if rate_limited and cached:
+                    self.stats["stale_served"] += 1
+                    return cached["data"]
+                delay = self._backoff_delay(response, attempt)
+                if attempt == self.max_retries or delay > self.max_backoff:
+                    if rate_limited:
+                        raise GitHubRateLimited(f"GitHub rate limit exhausted; resets in {delay:.0f}s")
+                    response.raise_for_status()
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            data = response.json()
+            self._remember(key, response, data)
+            return data
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"rate_limit": self.rate_limit, "cache_entries": len(self._cache), **self.stats}
+
 github_client = None
 if GITHUB_PAT:
-    github_client = Github(GITHUB_PAT)
+    github_client = AsyncGitHubClient(
+        GITHUB_PAT, GITHUB_API_URL, GITHUB_CACHE_TTL_SECONDS, GITHUB_MAX_RETRIES, GITHUB_MAX_BACKOFF_SECONDS
+    )
+
+# Request coalescing
+class SingleFlight:
+    """Collapse identical concurrent operations into one upstream call.
+
+    The first caller for a key starts the operation as a task; callers arriving
+    while it is in flight await the same task. Errors are shared with every waiter
+    but never cached, and the task is only cancelled once all waiters have gone.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[tuple, tuple] = {}
+        self.stats = defaultdict(lambda: {"calls": 0, "executions": 0, "coalesced": 0})
+
+    async def do(self, namespace: str, key: str, fn):
+        stats = self.stats[namespace]
+        stats["calls"] += 1
+        flight_key = (namespace, key)
+        flight = self._inflight.get(flight_key)
+        if flight:
+            stats["coalesced"] += 1
+        else:
+            stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            flight = (task, {"waiters": 0})
+            self._inflight[flight_key] = flight
+            task.add_done_callback(lambda t: self._finish(flight_key, t))
+
+        task, state = flight
+        state["waiters"] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and state["waiters"] == 1:
+                # Drop the flight now so a caller arriving before the task has
+                # finished cancelling starts a fresh one instead of joining it
+                if self._inflight.get(flight_key) is flight:
+                    del self._inflight[flight_key]
+                task.cancel()
+            raise
+        finally:
+            state["waiters"] -= 1
+
+    def _finish(self, flight_key: tuple, task: asyncio.Task):
+        if self._inflight.get(flight_key, (None,))[0] is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled
+            task.exception()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"namespaces": dict(self.stats), "in_flight": len(self._inflight)}
+
+singleflight = SingleFlight()
+
+# AI execution settings
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+AI_TIMEOUT_SECONDS = float(os.getenv("AI_TIMEOUT_SECONDS", "60"))
+
+class AIGenerationTimeout(Exception):
+    """Raised when a Gemini generation does not finish within its deadline"""
+
+class AIExecutor:
+    """Shared, bounded execution layer for Gemini generations.
+
+    Generations use the model's native async API so they never block the event
+    loop, at most ``max_concurrency`` run at once, and every call is bounded by a
+    deadline that also covers time spent waiting for a free slot.
+    """
+
+    def __init__(self, model_name: str, max_concurrency: int, timeout: float):
+        self.model_name = model_name
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._model = None
+
+    @property
+    def model(self):
+        # Build the model once and reuse it for every request
+        if self._model is None:
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    async def _generate(self, prompt: str, timeout: float) -> str:
+        async with self._semaphore:
+            with observe_upstream("gemini", "generate"):
+                response = await self.model.generate_content_async(
+                    prompt, request_options={"timeout": timeout}
+                )
+                return response.text
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Generate text for ``prompt``; cancelling the caller cancels the call"""
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(self._generate(prompt, timeout), timeout)
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.labels("gemini", "generate", "TimeoutError").inc()
+            raise AIGenerationTimeout(f"AI generation exceeded {timeout:g}s deadline")
+
+    async def stream(self, prompt: str, timeout: Optional[float] = None):
+        """Yield text chunks as Gemini produces them, under the same slot and deadline rules.
+
+        Closing the generator (e.g. on client disconnect) abandons the upstream stream.
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise AIGenerationTimeout(f"AI generation exceeded {timeout:g}s deadline")
+        try:
+            with observe_upstream("gemini", "stream"):
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        prompt, stream=True, request_options={"timeout": timeout}
+                    ),
+                    deadline - loop.time(),
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        yield chunk.text
+        except asyncio.TimeoutError:
+            raise AIGenerationTimeout(f"AI generation exceeded {timeout:g}s deadline")
+        finally:
+            self._semaphore.release()
+
+ai_executor = AIExecutor(GEMINI_MODEL_NAME, AI_MAX_CONCURRENCY, AI_TIMEOUT_SECONDS)
+
+# AI response cache settings
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "512"))
+AI_CACHE_TTL_SECONDS = {
+    "enhance": 6 * 3600,
+    "recommendations": 15 * 60,
+    "deployment_plan": 6 * 3600,
+    "component": 24 * 3600,
+}
+
+class AIResponseCache:
+    """Two-tier cache for generated text: in-process LRU backed by MongoDB.
+
+    Entries are content-addressed by a hash of (model, prompt template, params).
+    The Mongo tier relies on a TTL index on ``expires_at`` so it survives restarts
+    and is shared by every worker.
+    """
+
+    def __init__(self, collection, max_entries: int):
+        self.collection = collection
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = defaultdict(lambda: {"memory_hits": 0, "mongo_hits": 0, "misses": 0})
+
+    @staticmethod
+    def make_key(model_name: str, template: str, params: Dict[str, Any]) -> str:
+        normalized = {k: " ".join(str(v).split()) for k, v in params.items()}
+        payload = json.dumps(
+            {"model": model_name, "template": template, "params": normalized},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, route: str, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            self._entries.move_to_end(key)
+            self.stats[route]["memory_hits"] += 1
+            return entry[1]
+        self._entries.pop(key, None)
+
+        try:
+            doc = await self.collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+            )
+        except Exception:
+            logger.warning("AI cache lookup failed", exc_info=True)
+            doc = None
+        if doc:
+            expires_at = doc["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+            self._remember(key, doc["response"], expires_at)
+            self.stats[route]["mongo_hits"] += 1
+            return doc["response"]
+
+        self.stats[route]["misses"] += 1
+        return None
+
+    async def set(self, route: str, key: str, value: str):
+        ttl = AI_CACHE_TTL_SECONDS.get(route, 3600)
+        now = datetime.now(timezone.utc)
+        self._remember(key, value, now.timestamp() + ttl)
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "route": route,
+                    "model": ai_executor.model_name,
+                    "response": value,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                },
+                upsert=True,
+            )
+        except Exception:
+            logger.warning("AI cache write failed", exc_info=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "routes": dict(self.stats),
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": AI_CACHE_TTL_SECONDS,
+        }
+
+ai_cache = AIResponseCache(db.ai_response_cache, AI_CACHE_MAX_ENTRIES)
+
+async def generate_cached(route: str, template: str, params: Dict[str, Any], refresh: bool = False):
+    """Render ``template`` with ``params`` and generate it, consulting the cache first.
+
+    Returns ``(text, cached)``. ``refresh`` skips the lookup and overwrites the entry.
+    """
+    key = ai_cache.make_key(ai_executor.model_name, template, params)
+
+    async def lookup_or_generate():
+        if not refresh:
+            cached_text = await ai_cache.get(route, key)
+            if cached_text is not None:
+                return cached_text, True
+
+        ai_text = await ai_executor.generate(template.format(**params))
+        await ai_cache.set(route, key, ai_text)
+        return ai_text, False
+
+    # Identical concurrent prompts share one cache lookup / generation
+    return await singleflight.do("ai", f"{key}:refresh" if refresh else key, lookup_or_generate)
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str).decode()}\n\n"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+async def stream_cached(request: Request, route: str, template: str, params: Dict[str, Any],
+                        on_complete, refresh: bool = False):
+    """Server-Sent Events counterpart of ``generate_cached``.
+
+    Emits ``token`` events as text arrives, then awaits ``on_complete(full_text)`` and
+    emits its result as the ``done`` event. Generation failures become an ``error`` event.
+    """
+    key = ai_cache.make_key(ai_executor.model_name, template, params)
+    ai_text = None if refresh else await ai_cache.get(route, key)
+    if ai_text is not None:
+        yield sse_event("token", {"text": ai_text})
+    else:
+        parts = []
+        try:
+            # aclosing releases the AI slot and drops the upstream stream as soon as we
+            # stop iterating, instead of whenever the generator is garbage collected
+            async with aclosing(ai_executor.stream(template.format(**params))) as chunks:
+                async for chunk in chunks:
+                    if await request.is_disconnected():
+                        return
+                    parts.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"AI generation failed: {str(e)}"})
+            return
+        ai_text = "".join(parts)
+        await ai_cache.set(route, key, ai_text)
+
+    result = await on_complete(ai_text)
+    yield sse_event("done", result)
 
 # Pydantic Models
 class StatusResponse(BaseModel):
@@ -79,10 +651,905 @@ class MusicJamEnhancement(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     feature_name: str
     enhancement_type: str
-    ai_suggestion: Optional[str] = None
+    ai_suggestion: Optional[str] = None  # full text lives in generated_texts
+    ai_suggestion_preview: Optional[str] = None
     implementation_status: str = "planned"  # planned, implementing, deployed
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
 
+# List response schemas
+# Documented via response_model; handlers return page_response() so documents are
+# serialized once, straight from Mongo, rather than validated and re-encoded.
+class ProjectPage(BaseModel):
+    projects: List[Project]
+    next_cursor: Optional[str] = None
+
+class EnhancementPage(BaseModel):
+    enhancements: List[Dict[str, Any]]  # summary fields unless view=full or fields=...
+    next_cursor: Optional[str] = None
+
+class DeploymentPage(BaseModel):
+    deployments: List[Dict[str, Any]]  # summary fields unless view=full or fields=...
+    next_cursor: Optional[str] = None
+
+# Empire counters
+# One rollup document kept current with $inc on every insert/status change, so the
+# overview is a single document read. A periodic reconciliation, run by one process
+# at a time, recomputes it from the collections to repair any drift.
+COUNTERS_RECONCILE_INTERVAL_SECONDS = float(os.getenv("COUNTERS_RECONCILE_INTERVAL_SECONDS", "3600"))
+COUNTED_COLLECTIONS = {
+    "projects": "status",
+    "musicjam_enhancements": "implementation_status",
+    "deployments": "status",
+    "jam_sessions": "status",
+    "tab_playlists": None,
+}
+
+async def bump_counters(inc: Dict[str, int]):
+    try:
+        await db.empire_counters.update_one(
+            {"_id": "empire"},
+            {"$inc": inc, "$set": {"updated_at": datetime.now().isoformat()}},
+            upsert=True
+        )
+    except Exception:
+        logger.warning("Failed to update empire counters", exc_info=True)
+
+async def record_insert(collection: str, status: Optional[str] = None):
+    inc = {f"{collection}.total": 1}
+    if status:
+        inc[f"{collection}.{status}"] = 1
+    await bump_counters(inc)
+
+async def record_transition(collection: str, old_status: str, new_status: str):
+    if old_status != new_status:
+        await bump_counters({f"{collection}.{old_status}": -1, f"{collection}.{new_status}": 1})
+
+async def count_collection(collection: str, status_field: Optional[str]) -> Dict[str, int]:
+    counts = {"total": 0}
+    if not status_field:
+        counts["total"] = await db[collection].count_documents({})
+        return counts
+    async for row in db[collection].aggregate([{"$group": {"_id": f"${status_field}", "count": {"$sum": 1}}}]):
+        counts["total"] += row["count"]
+        if row["_id"]:
+            counts[str(row["_id"])] = row["count"]
+    return counts
+
+async def reconcile_collection_counters(collection: str) -> Dict[str, int]:
+    counts = await count_collection(collection, COUNTED_COLLECTIONS[collection])
+    await db.empire_counters.update_one(
+        {"_id": "empire"},
+        {"$set": {collection: counts, "updated_at": datetime.now().isoformat()}},
+        upsert=True
+    )
+    return counts
+
+async def reconcile_counters() -> Dict[str, Any]:
+    """Recompute the counters document from the underlying collections.
+
+    Each collection's counts are written with a targeted $set as soon as they are
+    computed, leaving the other collections' counters (and their in-flight $inc
+    updates) alone. A write whose $inc lands between a collection's count and its
+    $set can still be miscounted; the next run repairs it.
+    """
+    names = list(COUNTED_COLLECTIONS)
+    results = await asyncio.gather(*(reconcile_collection_counters(n) for n in names))
+    await db.empire_counters.update_one(
+        {"_id": "empire"}, {"$set": {"reconciled_at": datetime.now().isoformat()}}
+    )
+    return dict(zip(names, results))
+
+async def get_counters() -> Dict[str, Any]:
+    counters = await db.empire_counters.find_one({"_id": "empire"}, {"_id": 0})
+    if not counters:
+        counters = await reconcile_counters()
+    return counters
+
+async def run_periodically(name: str, interval: float, fn):
+    """Run ``fn`` every ``interval`` seconds until cancelled, logging failures"""
+    while True:
+        try:
+            await fn()
+        except Exception:
+            logger.warning("Periodic task %s failed", name, exc_info=True)
+        await asyncio.sleep(interval)
+
+# Periodic leases
+# Tasks that should run in one process only (not once per API worker) take a named
+# lease in ``periodic_leases`` before each run. The holder renews it every run; if
+# it dies, another process takes over once the lease expires.
+PERIODIC_LEASE_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+async def claim_periodic_lease(name: str, duration: float) -> bool:
+    """Take or renew the named lease for ``duration`` seconds; False if held elsewhere"""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.periodic_leases.find_one_and_update(
+            {"_id": name, "$or": [{"lease_expires_at": {"$lt": now}}, {"owner": PERIODIC_LEASE_OWNER}]},
+            {"$set": {
+                "owner": PERIODIC_LEASE_OWNER,
+                "lease_expires_at": now + timedelta(seconds=duration),
+                "updated_at": now
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+def run_exclusively(name: str, lease_seconds: float, fn):
+    """Wrap ``fn`` so it only runs in the process holding the ``name`` lease"""
+    async def run():
+        if await claim_periodic_lease(name, lease_seconds):
+            await fn()
+    return run
+
+# Keyset pagination
+# List endpoints page on (sort field, id) so each page is an index range scan no
+# matter how deep the client has paged. Cursors are opaque base64 JSON.
+PAGE_DEFAULT_LIMIT = 100
+PAGE_MAX_LIMIT = 500
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str) -> str:
+    value = doc.get(sort_field)
+    state = {"s": sort_field, "v": value, "id": doc["id"]}
+    if isinstance(value, datetime):
+        state.update(v=value.isoformat(), t="datetime")
+    payload = json.dumps(state)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: Optional[str], sort_field: str) -> Optional[Dict[str, Any]]:
+    """Decode a cursor, raising 400 if it is malformed or from a different sort order"""
+    if not cursor:
+        return None
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if after["s"] != sort_field or "id" not in after:
+            raise ValueError("cursor does not match sort order")
+        if after.get("t") == "datetime":
+            after["v"] = datetime.fromisoformat(after["v"])
+        return after
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_query(query: Dict[str, Any], sort_field: str, after: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not after:
+        return query
+    value, last_id = after["v"], after["id"]
+    if value is None:
+        # Missing sort values sort first; continue within them, then move on to the rest
+        after_clause = {"$or": [
+            {sort_field: None, "id": {"$gt": last_id}},
+            {sort_field: {"$ne": None}},
+        ]}
+    else:
+        after_clause = {"$or": [
+            {sort_field: {"$gt": value}},
+            {sort_field: value, "id": {"$gt": last_id}},
+        ]}
+    return {"$and": [query, after_clause]} if query else after_clause
+
+async def fetch_page(collection, query: Dict[str, Any], sort_field: str, limit: int,
+                     after: Optional[Dict[str, Any]], projection: Optional[Dict[str, Any]] = None):
+    """Fetch one page ordered by (sort_field, id); returns ``(docs, next_cursor)``"""
+    projection = projection or {"_id": 0}
+    docs = await collection.find(keyset_query(query, sort_field, after), projection) \
+        .sort([(sort_field, 1), ("id", 1)]).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    return docs, next_cursor
+
+# Index registry
+# Declarative list of indexes per collection, created at startup. Every lookup by
+# the application-level ``id`` is backed by a unique index, and list/filter
+# queries by compound indexes ending in the keyset sort order (sort field, id).
+def keyset_index(*fields: str) -> IndexModel:
+    keys = [(field, ASCENDING) for field in fields] + [("id", ASCENDING)]
+    return IndexModel(keys, name="_".join(fields) + "_id")
+
+def id_index() -> IndexModel:
+    return IndexModel([("id", ASCENDING)], unique=True, name="id_unique")
+
+INDEX_REGISTRY = {
+    "projects": [id_index(), keyset_index("created_at"), keyset_index("status", "created_at")],
+    "musicjam_enhancements": [id_index(), keyset_index("created_at")],
+    "deployments": [id_index(), keyset_index("created_at"), keyset_index("enhancement_id")],
+    "jam_sessions": [
+        id_index(),
+        keyset_index("starts_at"),
+        keyset_index("created_at"),
+        keyset_index("status", "starts_at"),
+        keyset_index("genres", "starts_at"),
+        keyset_index("status", "genres", "starts_at"),
+        keyset_index("status", "created_at"),
+        IndexModel([("status", ASCENDING), ("ends_at", ASCENDING)], name="status_ends_at"),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT), ("location", TEXT)],
+            weights={"title": 10, "description": 4, "location": 2},
+            name="search_text"
+        ),
+        IndexModel([("geo", GEOSPHERE), ("status", ASCENDING)], name="geo_2dsphere_status"),
+    ],
+    "tab_playlists": [
+        id_index(),
+        keyset_index("created_at"),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT), ("tabs.title", TEXT), ("tabs.artist", TEXT)],
+            weights={"title": 10, "description": 4, "tabs.title": 3, "tabs.artist": 3},
+            name="search_text"
+        ),
+    ],
+    "ai_response_cache": [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")],
+    "analytics_weekly": [IndexModel([("report", ASCENDING), ("week", ASCENDING)], name="report_week")],
+    "jobs": [
+        id_index(),
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_expires_at"),
+    ],
+}
+
+# Representative query shapes issued by the handlers, checked by the index advisor
+QUERY_SHAPES = [
+    ("projects", {"id": ""}, None),
+    ("projects", {}, {"created_at": 1, "id": 1}),
+    ("musicjam_enhancements", {"id": ""}, None),
+    ("musicjam_enhancements", {}, {"created_at": 1, "id": 1}),
+    ("deployments", {"id": ""}, None),
+    ("deployments", {}, {"created_at": 1, "id": 1}),
+    ("jam_sessions", {"id": ""}, None),
+    ("jam_sessions", {}, {"starts_at": 1, "id": 1}),
+    ("jam_sessions", {"status": "upcoming"}, {"starts_at": 1, "id": 1}),
+    ("jam_sessions", {"genres": {"$in": ["Rock"]}}, {"starts_at": 1, "id": 1}),
+    ("jam_sessions", {"status": "upcoming", "genres": {"$in": ["Rock"]}}, {"starts_at": 1, "id": 1}),
+    ("jam_sessions", {"starts_at": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 1, 8)}}, {"starts_at": 1, "id": 1}),
+    ("jam_sessions", {"status": "ongoing", "ends_at": {"$lte": datetime(2024, 1, 1)}}, None),
+    ("jam_sessions", {"status": "upcoming"}, {"created_at": 1, "id": 1}),
+    ("tab_playlists", {"id": ""}, None),
+    ("tab_playlists", {}, {"created_at": 1, "id": 1}),
+    ("jam_sessions", {"$text": {"$search": "jam"}}, None),
+    ("jam_sessions", {"geo": {"$nearSphere": {"$geometry": {"type": "Point", "coordinates": [0, 0]}}}}, None),
+    ("tab_playlists", {"$text": {"$search": "jam"}}, None),
+]
+
+async def ensure_indexes():
+    """Create every registered index; failures are logged per collection"""
+    async def create(collection: str, indexes: List[IndexModel]):
+        try:
+            await db[collection].create_indexes(indexes)
+        except Exception:
+            logger.warning("Could not create indexes on %s", collection, exc_info=True)
+
+    await asyncio.gather(*(create(name, indexes) for name, indexes in INDEX_REGISTRY.items()))
+
+def plan_stages(plan: Dict[str, Any]):
+    yield plan.get("stage")
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            yield from plan_stages(child)
+
+async def advise_indexes() -> Dict[str, Any]:
+    """Report query shapes (and recent profiled queries) that run without index support"""
+    unindexed = []
+    for collection, query, sort in QUERY_SHAPES:
+        find = {"find": collection, "filter": query}
+        if sort:
+            find["sort"] = sort
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        stages = [stage for stage in plan_stages(winning_plan) if stage]
+        if "COLLSCAN" in stages or "SORT" in stages:
+            unindexed.append({
+                "collection": collection,
+                "filter": query,
+                "sort": sort,
+                "stages": stages
+            })
+
+    # Queries captured by the database profiler, when profiling is enabled
+    profiled = []
+    try:
+        async for entry in db["system.profile"].find(
+            {"planSummary": "COLLSCAN"}, {"ns": 1, "command": 1, "millis": 1, "ts": 1, "_id": 0}
+        ).sort("ts", -1).limit(50):
+            profiled.append({
+                "namespace": entry.get("ns"),
+                "command": entry.get("command"),
+                "millis": entry.get("millis"),
+                "ts": entry["ts"].isoformat() if entry.get("ts") else None
+            })
+    except Exception:
+        logger.info("Profiler data unavailable", exc_info=True)
+
+    return {"unindexed_query_shapes": unindexed, "profiled_collection_scans": profiled}
+
+# Generated text store
+# Large Gemini outputs live in generated_texts (keyed "<kind>:<owner id>") and are
+# only loaded by detail endpoints; list documents carry a short preview instead.
+# Documents written before the split still hold the text inline and are read as-is.
+# Text is gzip-compressed at write time so the raw text endpoints can send the
+# stored bytes untouched to clients that accept gzip.
+PREVIEW_CHARS = 500
+GENERATED_TEXT_COMPRESS_LEVEL = int(os.getenv("GENERATED_TEXT_COMPRESS_LEVEL", "6"))
+
+async def store_generated_text(kind: str, owner_id: str, text: str):
+    raw = text.encode("utf-8")
+    await db.generated_texts.replace_one(
+        {"_id": f"{kind}:{owner_id}"},
+        {
+            "kind": kind,
+            "owner_id": owner_id,
+            "encoding": "gzip",
+            "data": gzip.compress(raw, compresslevel=GENERATED_TEXT_COMPRESS_LEVEL, mtime=0),
+            "size": len(raw),
+            "created_at": datetime.now().isoformat()
+        },
+        upsert=True
+    )
+
+async def load_generated_blob(kind: str, owner_id: str) -> Optional[Dict[str, Any]]:
+    """Stored document for a generated text; older uncompressed ones carry "text" instead of "data"."""
+    return await db.generated_texts.find_one(
+        {"_id": f"{kind}:{owner_id}"}, {"encoding": 1, "data": 1, "text": 1}
+    )
+
+def decode_generated_text(doc: Dict[str, Any]) -> str:
+    if doc.get("encoding") == "gzip":
+        return gzip.decompress(doc["data"]).decode("utf-8")
+    return doc.get("text", "")
+
+async def load_generated_text(kind: str, owner_id: str) -> Optional[str]:
+    doc = await load_generated_blob(kind, owner_id)
+    return decode_generated_text(doc) if doc else None
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return float(quality) > 0 if quality else True
+        except ValueError:
+            return False
+    return False
+
+async def generated_text_response(request: Request, kind: str, owner_id: str, inline_text: Optional[str]) -> Response:
+    """Serve a generated text, passing stored gzip bytes through when the client accepts them"""
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "private, max-age=300"}
+    media_type = "text/markdown; charset=utf-8"
+    if inline_text is not None:
+        return Response(inline_text, media_type=media_type, headers=headers)
+    doc = await load_generated_blob(kind, owner_id)
+    if not doc:
+        return Response("", media_type=media_type, headers=headers)
+    if doc.get("encoding") == "gzip" and accepts_encoding(request.headers.get("Accept-Encoding"), "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return Response(doc["data"], media_type=media_type, headers=headers)
+    return Response(decode_generated_text(doc), media_type=media_type, headers=headers)
+
+async def save_enhancement(feature_name: str, enhancement_type: str, ai_text: str) -> MusicJamEnhancement:
+    enhancement_record = MusicJamEnhancement(
+        feature_name=feature_name,
+        enhancement_type=enhancement_type,
+        ai_suggestion_preview=ai_text[:PREVIEW_CHARS]
+    )
+    await store_generated_text("ai_suggestion", enhancement_record.id, ai_text)
+    await db.musicjam_enhancements.insert_one(enhancement_record.model_dump(exclude={"ai_suggestion"}))
+    await record_change("musicjam_enhancements", "insert", enhancement_record.id, enhancement_record.model_dump())
+    await record_insert("musicjam_enhancements", enhancement_record.implementation_status)
+    return enhancement_record
+
+async def with_ai_suggestion(enhancement: Dict[str, Any]) -> Dict[str, Any]:
+    if enhancement.get("ai_suggestion") is None:
+        enhancement["ai_suggestion"] = await load_generated_text("ai_suggestion", enhancement["id"]) or ""
+    return enhancement
+
+async def save_deployment(enhancement_id: str, target: str, deployment_plan: Dict[str, Any],
+                          status: str = "deploying") -> Dict[str, Any]:
+    deployment = {
+        "id": str(uuid.uuid4()),
+        "enhancement_id": enhancement_id,
+        "target": target,
+        "status": status,
+        "deployment_plan": {k: v for k, v in deployment_plan.items() if k != "plan"},
+        "created_at": datetime.now().isoformat()
+    }
+    if "plan" in deployment_plan:
+        await store_generated_text("deployment_plan", deployment["id"], deployment_plan["plan"])
+    await db.deployments.insert_one(deployment)
+    await record_change("deployments", "insert", deployment["id"], deployment)
+    await record_insert("deployments", deployment["status"])
+    deployment.pop("_id", None)
+    return deployment
+
+async def with_deployment_plan(deployment: Dict[str, Any]) -> Dict[str, Any]:
+    plan = deployment.setdefault("deployment_plan", {})
+    if "plan" not in plan:
+        plan["plan"] = await load_generated_text("deployment_plan", deployment["id"]) or ""
+    return deployment
+
+# Sparse fieldsets for list endpoints
+ENHANCEMENT_SUMMARY_FIELDS = [
+    "feature_name", "enhancement_type", "implementation_status", "ai_suggestion_preview", "created_at"
+]
+DEPLOYMENT_SUMMARY_FIELDS = [
+    "enhancement_id", "target", "status", "created_at",
+    "deployment_plan.estimated_duration", "deployment_plan.complexity", "deployment_plan.risk_level"
+]
+
+def list_projection(fields: Optional[str], view: str, summary_fields: List[str], sort_field: str) -> Dict[str, Any]:
+    """Build the Mongo projection for a list view; ``id`` and the sort field are always kept"""
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        if any(f.startswith("$") or f == "_id" or "" in f.split(".") for f in selected):
+            raise HTTPException(status_code=400, detail="Invalid fields parameter")
+        # Mongo rejects a projection naming both a path and one of its sub-paths
+        paths = set(selected) | {"id", sort_field}
+        if any(other.startswith(f"{path}.") for path in paths for other in paths):
+            raise HTTPException(status_code=400, detail="Overlapping paths in fields parameter")
+    elif view == "summary":
+        selected = summary_fields
+    else:
+        return {"_id": 0}
+    return {"_id": 0, "id": 1, sort_field: 1, **{f: 1 for f in selected}}
+
+# Durable job queue
+# Jobs are documents in the ``jobs`` collection. Workers claim them atomically with
+# find_one_and_update and hold a lease; a job whose lease expires (worker crashed or
+# stalled) becomes claimable again, unless that was its last attempt, in which case
+# it is failed. Failures are retried with exponential backoff until max_attempts,
+# after which the job type's failure handler runs.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+
+async def enqueue_job(job_type: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+    now = datetime.now(timezone.utc)
+    job = {
+        "id": str(uuid.uuid4()),
+        "type": job_type,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "run_at": now,
+        "lease_expires_at": None,
+        "locked_by": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+    await db.jobs.insert_one(job)
+    return job["id"]
+
+async def claim_job(worker_id: str) -> Optional[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_at": {"$lte": now}},
+            {
+                "status": "running",
+                "lease_expires_at": {"$lt": now},
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+            },
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "locked_by": worker_id,
+                "lease_expires_at": now + timedelta(seconds=JOB_VISIBILITY_TIMEOUT_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("run_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def finish_job(job: Dict[str, Any], worker_id: str, error: Optional[Exception] = None):
+    now = datetime.now(timezone.utc)
+    owned = {"id": job["id"], "locked_by": worker_id, "status": "running"}
+    if error is None:
+        update = {"status": "succeeded", "lease_expires_at": None, "updated_at": now}
+    elif job["attempts"] < job["max_attempts"]:
+        delay = JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+        update = {
+            "status": "queued",
+            "run_at": now + timedelta(seconds=delay),
+            "lease_expires_at": None,
+            "last_error": str(error),
+            "updated_at": now
+        }
+    else:
+        update = {"status": "failed", "lease_expires_at": None, "last_error": str(error), "updated_at": now}
+    result = await db.jobs.update_one(owned, {"$set": update})
+    if result.modified_count and update["status"] == "failed":
+        await run_failure_handler(job, error)
+
+async def fail_expired_job() -> Optional[Dict[str, Any]]:
+    """Fail one job whose lease expired on its last attempt (its worker crashed or stalled)"""
+    now = datetime.now(timezone.utc)
+    job = await db.jobs.find_one_and_update(
+        {
+            "status": "running",
+            "lease_expires_at": {"$lt": now},
+            "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+        },
+        {"$set": {
+            "status": "failed",
+            "lease_expires_at": None,
+            "last_error": "Lease expired on the final attempt",
+            "updated_at": now
+        }},
+        return_document=ReturnDocument.AFTER
+    )
+    if job:
+        await run_failure_handler(job, RuntimeError(job["last_error"]))
+    return job
+
+async def run_failure_handler(job: Dict[str, Any], error: Exception):
+    on_failure = JOB_FAILURE_HANDLERS.get(job["type"])
+    if on_failure:
+        await on_failure(job["payload"], error)
+
+class JobWorkerPool:
+    """Runs ``concurrency`` worker coroutines that claim and execute queued jobs"""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.worker_prefix}:{n}")) for n in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run_forever(self):
+        await self.start()
+        await asyncio.gather(*self._tasks)
+
+    async def _work(self, worker_id: str):
+        while True:
+            try:
+                expired = await fail_expired_job()
+                if expired:
+                    logger.warning("Job %s (%s) failed: lease expired on its final attempt",
+                                   expired["id"], expired["type"])
+                job = await claim_job(worker_id)
+            except Exception:
+                logger.warning("Job claim failed", exc_info=True)
+                job = None
+            if not job:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            try:
+                await self._run(job, worker_id)
+            except Exception:
+                # Recording the outcome failed; the lease expires and the job is retried
+                logger.warning("Job %s (%s) could not be finished", job["id"], job["type"], exc_info=True)
+
+    async def _run(self, job: Dict[str, Any], worker_id: str):
+        handler = JOB_HANDLERS.get(job["type"])
+        try:
+            if not handler:
+                raise ValueError(f"Unknown job type: {job['type']}")
+            await handler(job["payload"])
+        except Exception as e:
+            logger.warning("Job %s (%s) failed", job["id"], job["type"], exc_info=True)
+            await finish_job(job, worker_id, e)
+        else:
+            await finish_job(job, worker_id)
+
+job_workers = JobWorkerPool(JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS)
+
+# Change feed
+# Pushes incremental change events for watched collections to any number of
+# subscribers. When the deployment supports change streams (replica set / sharded
+# cluster) one server-side stream feeds every subscriber and sees writes from all
+# workers; otherwise handlers publish their own writes in-process ("local" mode).
+CHANGE_FEED_COLLECTIONS = ["projects", "deployments", "musicjam_enhancements"]
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "256"))
+CHANGE_FEED_HEARTBEAT_SECONDS = 15
+
+def change_event(collection: str, operation: str, doc_id: Optional[str], fields: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {k: v for k, v in fields.items() if k not in ("_id", "ai_suggestion", "deployment_plan.plan")}
+    if isinstance(fields.get("deployment_plan"), dict):
+        fields["deployment_plan"] = {k: v for k, v in fields["deployment_plan"].items() if k != "plan"}
+    return {
+        "collection": collection,
+        "operation": operation,
+        "id": doc_id,
+        "fields": orjson.loads(orjson.dumps(fields, default=str)),
+        "ts": datetime.now().isoformat()
+    }
+
+class ChangeFeed:
+    """Fan-out hub for document change events"""
+
+    def __init__(self, collections: List[str], queue_size: int):
+        self.collections = collections
+        self.queue_size = queue_size
+        self.mode = "local"
+        self._subscribers: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]):
+        for queue in self._subscribers:
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block everyone else
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _open_stream(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": self.collections},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+        }}]
+        return db.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token)
+
+    def _dispatch(self, change: Dict[str, Any]):
+        self._resume_token = change["_id"]
+        operation = change["operationType"]
+        full_document = change.get("fullDocument") or {}
+        if operation == "update":
+            fields = change.get("updateDescription", {}).get("updatedFields", {})
+        else:
+            fields = full_document
+        self.publish(change_event(change["ns"]["coll"], operation, full_document.get("id"), fields))
+
+    async def start(self):
+        try:
+            stream = self._open_stream()
+            first = await stream.try_next()
+        except Exception:
+            logger.info("Change streams unavailable; using in-process change feed", exc_info=True)
+            return
+        self.mode = "change_stream"
+        if first:
+            self._dispatch(first)
+        self._task = asyncio.create_task(self._run(stream))
+
+    async def _run(self, stream):
+        while True:
+            try:
+                async for change in stream:
+                    self._dispatch(change)
+            except Exception:
+                logger.warning("Change stream interrupted; resuming", exc_info=True)
+                await asyncio.sleep(1)
+                stream = self._open_stream()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+change_feed = ChangeFeed(CHANGE_FEED_COLLECTIONS, CHANGE_FEED_QUEUE_SIZE)
+
+# Collection versions
+# Every write bumps a per-collection version counter (shared in Mongo, mirrored in
+# memory and refreshed every COLLECTION_VERSION_REFRESH_SECONDS) so read endpoints
+# can answer If-None-Match from memory. A collection whose bump failed is marked
+# unversioned, which disables its conditional responses rather than risking stale
+# 304s; only a successful bump (retried on each refresh) clears the mark.
+COLLECTION_VERSION_REFRESH_SECONDS = float(os.getenv("COLLECTION_VERSION_REFRESH_SECONDS", "1"))
+collection_versions: Dict[str, int] = {}
+unversioned_collections: set = set()
+
+async def bump_collection_version(collection: str):
+    try:
+        doc = await db.collection_versions.find_one_and_update(
+            {"_id": collection},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception:
+        unversioned_collections.add(collection)
+        collection_versions.pop(collection, None)
+        logger.warning("Failed to bump version of %s", collection, exc_info=True)
+        return
+    unversioned_collections.discard(collection)
+    collection_versions[collection] = max(collection_versions.get(collection, 0), doc["version"])
+
+async def refresh_collection_versions():
+    # Retry failed bumps first; the DB still holds the pre-write version for them
+    for name in list(unversioned_collections):
+        await bump_collection_version(name)
+    versions = {name: 0 for name in COUNTED_COLLECTIONS}
+    async for doc in db.collection_versions.find({}):
+        versions[doc["_id"]] = doc["version"]
+    for name, version in versions.items():
+        if name not in unversioned_collections:
+            collection_versions[name] = max(collection_versions.get(name, 0), version)
+
+async def record_change(collection: str, operation: str, doc_id: str, fields: Dict[str, Any]):
+    """Bump the collection version and, without change streams, publish the change in-process"""
+    await bump_collection_version(collection)
+    if change_feed.mode == "local" and collection in change_feed.collections:
+        change_feed.publish(change_event(collection, operation, doc_id, fields))
+
+# Conditional GET
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def conditional_get(collection: Optional[str] = None, max_age: int = 0):
+    """Dependency adding a strong ETag and Cache-Control, answering matches with 304.
+
+    The ETag covers the route, its query string and the collection version, so a
+    matching If-None-Match is answered before the handler (and the DB) is touched.
+    Without a collection the response is treated as static.
+    """
+    cache_control = f"public, max-age={max_age}" if max_age else "public, no-cache"
+
+    async def dependency(request: Request, response: Response):
+        if collection:
+            version = collection_versions.get(collection)
+            if version is None:
+                return
+        else:
+            version = app.version
+        key = f"{request.url.path}?{request.url.query}|{version}"
+        etag = '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(dependency)
+
+# Bulk ingest
+# Bodies are a JSON array or NDJSON (one document per line). Items are validated in
+# chunks and each chunk is written with an unordered insert_many while the next one
+# is being validated; bad items are reported per index and never abort the batch.
+# A JSON array has to be parsed whole, so its size is capped; NDJSON is parsed line
+# by line as it streams in and is the format for large imports.
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "100000"))
+BULK_MAX_JSON_BYTES = int(os.getenv("BULK_MAX_JSON_BYTES", str(10 * 1024 * 1024)))
+
+async def read_bulk_json_body(request: Request) -> bytes:
+    """Read a JSON array body, refusing it with 413 once it exceeds BULK_MAX_JSON_BYTES"""
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"JSON bodies are limited to {BULK_MAX_JSON_BYTES} bytes; send large imports as NDJSON"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > BULK_MAX_JSON_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BULK_MAX_JSON_BYTES:
+            raise too_large
+    return bytes(body)
+
+async def iter_bulk_items(request: Request):
+    """Yield (index, item) pairs; unparseable NDJSON lines are yielded as ValueError"""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            items = orjson.loads(await read_bulk_json_body(request))
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array or an NDJSON body")
+        for index, item in enumerate(items):
+            yield index, item
+        return
+
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, parse_ndjson_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, parse_ndjson_line(buffer)
+
+def parse_ndjson_line(line: bytes):
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return ValueError(f"Invalid JSON: {str(e)}")
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in error.errors()
+    )
+
+async def insert_bulk_chunk(collection: str, chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """Insert validated (index, document) pairs unordered and return per-item results"""
+    failed = {}
+    if chunk:
+        try:
+            await db[collection].insert_many([doc for _, doc in chunk], ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            failed = {position: str(e) for position in range(len(chunk))}
+
+    inserted = [doc for position, (_, doc) in enumerate(chunk) if position not in failed]
+    if inserted:
+        status_field = COUNTED_COLLECTIONS.get(collection)
+        inc = defaultdict(int)
+        inc[f"{collection}.total"] = len(inserted)
+        for doc in inserted:
+            if status_field and doc.get(status_field):
+                inc[f"{collection}.{doc[status_field]}"] += 1
+        await bump_counters(dict(inc))
+        await record_change(collection, "bulk_insert", None, {"count": len(inserted)})
+
+    return [
+        {"index": index, "error": failed[position]} if position in failed else {"index": index, "id": doc["id"]}
+        for position, (index, doc) in enumerate(chunk)
+    ]
+
+async def bulk_ingest(request: Request, model, collection: str) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    chunk: List[tuple] = []
+    pending: Optional[asyncio.Task] = None
+
+    async def flush():
+        nonlocal chunk, pending
+        if pending:
+            results.extend(await pending)
+        pending = asyncio.create_task(insert_bulk_chunk(collection, chunk))
+        chunk = []
+
+    try:
+        async for index, item in iter_bulk_items(request):
+            if index >= BULK_MAX_ITEMS:
+                results.append({"index": index, "error": f"Limit of {BULK_MAX_ITEMS} items reached; the rest was not read"})
+                break
+            if isinstance(item, ValueError):
+                results.append({"index": index, "error": str(item)})
+                continue
+            try:
+                chunk.append((index, model.model_validate(item).model_dump()))
+            except ValidationError as e:
+                results.append({"index": index, "error": validation_message(e)})
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                await flush()
+        await flush()
+        results.extend(await pending)
+    except BaseException:
+        # Let an in-flight chunk finish so its counters and version bump are not lost
+        if pending:
+            await asyncio.gather(pending, return_exceptions=True)
+        raise
+
+    results.sort(key=lambda result: result["index"])
+    created = sum(1 for result in results if "id" in result)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
 # Empire Dashboard Routes
 @app.get("/api", response_model=StatusResponse)
 async def root():
@@ -112,17 +1579,17 @@ async def status():
 async def empire_overview():
     """Get overview of entire YazWho Empire"""
     try:
-        projects_count = await db.projects.count_documents({})
-        enhancements_count = await db.musicjam_enhancements.count_documents({})
+        counters = await get_counters()
         
-        # Check MusicJam status
-        musicjam_status = await check_musicjam_status()
+        # Latest result from the background MusicJam prober
+        musicjam_status = musicjam_prober.latest()
         
         return {
             "empire_status": "operational",
             "musicjam_app": musicjam_status,
-            "managed_projects": projects_count,
-            "ai_enhancements": enhancements_count,
+            "managed_projects": counters.get("projects", {}).get("total", 0),
+            "ai_enhancements": counters.get("musicjam_enhancements", {}).get("total", 0),
+            "counters": counters,
             "integrations": {
                 "github": "active" if github_client else "inactive",
                 "ai_engine": "gemini" if GEMINI_API_KEY else "inactive",
@@ -133,17 +1600,96 @@ async def empire_overview():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Empire overview failed: {str(e)}")
 
-async def check_musicjam_status():
-    """Check status of live MusicJam application"""
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus metrics for this process: route latency, in-flight requests, MongoDB and upstream calls"""
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/api/admin/index-advisor")
+async def index_advisor_report():
+    """Report queries running without index support"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get("https://musicjam.yazwho.com/", timeout=5.0)
+        return await advise_indexes()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Index advisor failed: {str(e)}")
+
+@app.post("/api/empire/counters/reconcile")
+async def reconcile_empire_counters():
+    """Recompute the overview counters from the collections"""
+    try:
+        return {"counters": await reconcile_counters()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Counter reconciliation failed: {str(e)}")
+
+# MusicJam health probe settings
+MUSICJAM_URL = os.getenv("MUSICJAM_URL", "https://musicjam.yazwho.com/")
+MUSICJAM_PROBE_INTERVAL_SECONDS = float(os.getenv("MUSICJAM_PROBE_INTERVAL_SECONDS", "30"))
+MUSICJAM_PROBE_TIMEOUT_SECONDS = float(os.getenv("MUSICJAM_PROBE_TIMEOUT_SECONDS", "5"))
+
+class MusicJamProber:
+    """Background health checker for the live MusicJam application.
+
+    Probes run on a fixed interval through one long-lived pooled client, so
+    request handlers only ever read the latest cached result.
+    """
+
+    def __init__(self, url: str, interval: float, timeout: float):
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[datetime] = None
+
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=2, max_keepalive_connections=1),
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._client:
+            await self._client.aclose()
+
+    async def probe(self) -> Dict[str, Any]:
+        """Check status of live MusicJam application"""
+        try:
+            with observe_upstream("musicjam", "probe"):
+                response = await self._client.get(self.url)
             if response.status_code == 200:
-                return {"status": "online", "url": "https://musicjam.yazwho.com/"}
+                return {"status": "online", "url": self.url}
             else:
+                UPSTREAM_ERRORS.labels("musicjam", "probe", f"http_{response.status_code}").inc()
                 return {"status": "issues", "code": response.status_code}
-    except:
-        return {"status": "offline", "url": "https://musicjam.yazwho.com/"}
+        except Exception:
+            return {"status": "offline", "url": self.url}
+
+    async def _run(self):
+        while True:
+            self._result = await self.probe()
+            self._checked_at = datetime.now()
+            await asyncio.sleep(self.interval)
+
+    def latest(self) -> Dict[str, Any]:
+        if self._result is None:
+            return {"status": "unknown", "url": self.url, "checked_at": None, "age_seconds": None}
+        return {
+            **self._result,
+            "checked_at": self._checked_at.isoformat(),
+            "age_seconds": round((datetime.now() - self._checked_at).total_seconds(), 1)
+        }
+
+musicjam_prober = MusicJamProber(
+    MUSICJAM_URL, MUSICJAM_PROBE_INTERVAL_SECONDS, MUSICJAM_PROBE_TIMEOUT_SECONDS
+)
 
 # GitHub Integration Routes
 @app.get("/api/github/repositories")
@@ -153,25 +1699,43 @@ async def get_repositories():
         raise HTTPException(status_code=400, detail="GitHub integration not configured")
     
     try:
-        user = github_client.get_user()
-        repos = []
-        for repo in user.get_repos(sort="updated", direction="desc")[:20]:
-            repos.append({
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "url": repo.html_url,
-                "clone_url": repo.clone_url,
-                "language": repo.language,
-                "stars": repo.stargazers_count,
-                "updated_at": repo.updated_at.isoformat() if repo.updated_at else None
-            })
+        # Share one fetch between concurrent callers
+        repos = await singleflight.do("github_repositories", "default", fetch_repositories)
         return {"repositories": repos}
+    except GitHubRateLimited as e:
+        raise HTTPException(status_code=503, detail=f"GitHub API error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"GitHub API error: {str(e)}")
 
+@app.get("/api/github/rate-limit")
+async def get_github_rate_limit():
+    """Get the last seen GitHub rate limit and client cache counters"""
+    if not github_client:
+        raise HTTPException(status_code=400, detail="GitHub integration not configured")
+    return github_client.snapshot()
+
+async def fetch_repositories():
+    """Fetch the user's 20 most recently updated repositories"""
+    data = await github_client.get_json(
+        "/user/repos", {"sort": "updated", "direction": "desc", "per_page": 20}
+    )
+    repos = []
+    for repo in data:
+        updated_at = repo.get("updated_at")
+        repos.append({
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "description": repo.get("description"),
+            "url": repo.get("html_url"),
+            "clone_url": repo.get("clone_url"),
+            "language": repo.get("language"),
+            "stars": repo.get("stargazers_count", 0),
+            "updated_at": datetime.fromisoformat(updated_at.replace("Z", "+00:00")).isoformat() if updated_at else None
+        })
+    return repos
+
 @app.post("/api/github/deploy")
-async def deploy_project(deployment: DeploymentRequest, background_tasks: BackgroundTasks):
+async def deploy_project(deployment: DeploymentRequest):
     """Deploy a project to specified platform"""
     try:
         # Create project record
@@ -182,56 +1746,91 @@ async def deploy_project(deployment: DeploymentRequest, background_tasks: Backgr
             status="deploying"
         )
         
-        await db.projects.insert_one(project.dict())
+        await db.projects.insert_one(project.model_dump())
+        await record_change("projects", "insert", project.id, project.model_dump())
+        await record_insert("projects", project.status)
         
-        # Start deployment in background
-        background_tasks.add_task(process_deployment, project.dict())
+        # Queue the deployment for the job workers
+        job_id = await enqueue_job("deploy_project", project.model_dump())
         
         return {
             "message": "Deployment initiated",
             "project_id": project.id,
+            "job_id": job_id,
             "status": "deploying"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Deployment failed: {str(e)}")
 
 async def process_deployment(project_data: dict):
-    """Background task to process deployment"""
-    try:
-        # Simulate deployment process
-        await asyncio.sleep(2)
-        
-        # Update project status
-        await db.projects.update_one(
-            {"id": project_data["id"]},
-            {"$set": {
-                "status": "deployed",
-                "deployment_url": f"https://{project_data['name']}.vercel.app",
-                "updated_at": datetime.now().isoformat()
-            }}
-        )
-    except Exception as e:
-        await db.projects.update_one(
-            {"id": project_data["id"]},
-            {"$set": {
-                "status": "failed",
-                "updated_at": datetime.now().isoformat()
-            }}
-        )
+    """Job handler that processes a deployment; raising lets the queue retry it"""
+    # Simulate deployment process
+    await asyncio.sleep(2)
+    
+    # Update project status
+    changes = {
+        "status": "deployed",
+        "deployment_url": f"https://{project_data['name']}.vercel.app",
+        "updated_at": datetime.now().isoformat()
+    }
+    result = await db.projects.update_one(
+        {"id": project_data["id"], "status": project_data["status"]},
+        {"$set": changes}
+    )
+    if result.modified_count:
+        await record_transition("projects", project_data["status"], "deployed")
+        await record_change("projects", "update", project_data["id"], changes)
+
+async def fail_deployment(project_data: dict, error: Exception):
+    """Mark a project failed once its deployment job has exhausted its retries"""
+    changes = {"status": "failed", "updated_at": datetime.now().isoformat()}
+    result = await db.projects.update_one(
+        {"id": project_data["id"], "status": project_data["status"]},
+        {"$set": changes}
+    )
+    if result.modified_count:
+        await record_transition("projects", project_data["status"], "failed")
+        await record_change("projects", "update", project_data["id"], changes)
+
+
+@app.get("/api/changes/stream")
+async def stream_changes(request: Request, collections: Optional[str] = None):
+    """Push project, deployment and enhancement change events as Server-Sent Events"""
+    wanted = set(collections.split(",")) if collections else set(CHANGE_FEED_COLLECTIONS)
+    unknown = wanted - set(CHANGE_FEED_COLLECTIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported collections: {', '.join(sorted(unknown))}")
+
+    async def events():
+        queue = change_feed.subscribe()
+        try:
+            yield sse_event("ready", {"mode": change_feed.mode, "collections": sorted(wanted)})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), CHANGE_FEED_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event["collection"] in wanted:
+                    yield sse_event("change", event)
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get status of a queued background job"""
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "payload": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 # AI Enhancement Routes
-@app.post("/api/ai/musicjam/enhance")
-async def enhance_musicjam(enhancement: AIEnhancementRequest):
-    """Use AI to suggest MusicJam enhancements"""
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=400, detail="Gemini AI not configured")
-    
-    try:
-        # Create AI prompt
-        prompt = f"""
-        Suggest improvements for the MusicJam music application feature: {enhancement.musicjam_feature}
-        Enhancement type: {enhancement.enhancement_type}
-        User preferences: {enhancement.user_preferences or 'None specified'}
+ENHANCE_PROMPT = """
+        Suggest improvements for the MusicJam music application feature: {musicjam_feature}
+        Enhancement type: {enhancement_type}
+        User preferences: {user_preferences}
         
         Provide specific, actionable suggestions for implementation including:
         1. Technical approach
@@ -241,36 +1840,61 @@ async def enhance_musicjam(enhancement: AIEnhancementRequest):
         
         Focus on creating engaging music discovery and social features.
         """
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
+
+@app.post("/api/ai/musicjam/enhance")
+async def enhance_musicjam(enhancement: AIEnhancementRequest, refresh: bool = False):
+    """Use AI to suggest MusicJam enhancements"""
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=400, detail="Gemini AI not configured")
+    
+    try:
+        ai_text, cached = await generate_cached("enhance", ENHANCE_PROMPT, {
+            "musicjam_feature": enhancement.musicjam_feature,
+            "enhancement_type": enhancement.enhancement_type,
+            "user_preferences": enhancement.user_preferences or 'None specified',
+        }, refresh=refresh)
         
         # Save enhancement suggestion
-        enhancement_record = MusicJamEnhancement(
-            feature_name=enhancement.musicjam_feature,
-            enhancement_type=enhancement.enhancement_type,
-            ai_suggestion=response.text
+        enhancement_record = await save_enhancement(
+            enhancement.musicjam_feature, enhancement.enhancement_type, ai_text
         )
         
-        await db.musicjam_enhancements.insert_one(enhancement_record.dict())
-        
         return {
             "enhancement_id": enhancement_record.id,
-            "ai_suggestion": response.text,
+            "ai_suggestion": ai_text,
             "feature": enhancement.musicjam_feature,
-            "type": enhancement.enhancement_type
+            "type": enhancement.enhancement_type,
+            "cached": cached
         }
+    except AIGenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=f"AI enhancement failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI enhancement failed: {str(e)}")
 
-@app.get("/api/ai/recommendations/music")
-async def get_music_recommendations(mood: str = "happy", genre: str = "any"):
-    """Get AI-powered music recommendations"""
+@app.post("/api/ai/musicjam/enhance/stream")
+async def stream_enhance_musicjam(enhancement: AIEnhancementRequest, request: Request, refresh: bool = False):
+    """Stream AI MusicJam enhancement suggestions as Server-Sent Events"""
     if not GEMINI_API_KEY:
         raise HTTPException(status_code=400, detail="Gemini AI not configured")
-    
-    try:
-        prompt = f"""
+
+    async def enhancement_done(ai_text: str):
+        enhancement_record = await save_enhancement(
+            enhancement.musicjam_feature, enhancement.enhancement_type, ai_text
+        )
+        return {
+            "enhancement_id": enhancement_record.id,
+            "feature": enhancement.musicjam_feature,
+            "type": enhancement.enhancement_type
+        }
+
+    events = stream_cached(request, "enhance", ENHANCE_PROMPT, {
+        "musicjam_feature": enhancement.musicjam_feature,
+        "enhancement_type": enhancement.enhancement_type,
+        "user_preferences": enhancement.user_preferences or 'None specified',
+    }, enhancement_done, refresh=refresh)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+RECOMMENDATIONS_PROMPT = """
         Generate music recommendations for:
         Mood: {mood}
         Genre preference: {genre}
@@ -282,26 +1906,52 @@ async def get_music_recommendations(mood: str = "happy", genre: str = "any"):
         
         Format as JSON array.
         """
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
+
+@app.get("/api/ai/recommendations/music")
+async def get_music_recommendations(mood: str = "happy", genre: str = "any", refresh: bool = False):
+    """Get AI-powered music recommendations"""
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=400, detail="Gemini AI not configured")
+    
+    try:
+        ai_text, cached = await generate_cached(
+            "recommendations", RECOMMENDATIONS_PROMPT, {"mood": mood, "genre": genre}, refresh=refresh
+        )
         
         return {
-            "recommendations": response.text,
+            "recommendations": ai_text,
             "mood": mood,
             "genre": genre,
+            "cached": cached,
             "generated_at": datetime.now().isoformat()
         }
+    except AIGenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=f"Music recommendation failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Music recommendation failed: {str(e)}")
 
+@app.get("/api/coalescing/stats")
+async def get_coalescing_stats():
+    """Get counts of upstream calls collapsed by request coalescing"""
+    return singleflight.snapshot()
+
+@app.get("/api/ai/cache/stats")
+async def get_ai_cache_stats():
+    """Get AI response cache hit/miss counters per route"""
+    return ai_cache.snapshot()
+
 # Project Management Routes
-@app.get("/api/projects")
-async def get_projects():
-    """Get all managed projects"""
+@app.get("/api/projects", response_model=ProjectPage, dependencies=[conditional_get("projects")])
+async def get_projects(
+    response: Response,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None
+):
+    """Get managed projects, one keyset page at a time"""
+    after = decode_cursor(cursor, "created_at")
     try:
-        projects = await db.projects.find({}, {"_id": 0}).to_list(100)
-        return {"projects": projects}
+        projects, next_cursor = await fetch_page(db.projects, {}, "created_at", limit, after)
+        return page_response(response, projects=projects, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch projects: {str(e)}")
 
@@ -316,67 +1966,144 @@ async def get_project(project_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch project: {str(e)}")
 
-@app.get("/api/musicjam/enhancements")
-async def get_musicjam_enhancements():
-    """Get all MusicJam AI enhancements"""
+@app.get("/api/musicjam/enhancements", response_model=EnhancementPage)
+async def get_musicjam_enhancements(
+    response: Response,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    fields: Optional[str] = None
+):
+    """Get MusicJam AI enhancements, one keyset page at a time"""
+    after = decode_cursor(cursor, "created_at")
+    projection = list_projection(fields, view, ENHANCEMENT_SUMMARY_FIELDS, "created_at")
     try:
-        enhancements = await db.musicjam_enhancements.find({}, {"_id": 0}).to_list(100)
-        return {"enhancements": enhancements}
+        enhancements, next_cursor = await fetch_page(
+            db.musicjam_enhancements, {}, "created_at", limit, after, projection
+        )
+        return page_response(response, enhancements=enhancements, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch enhancements: {str(e)}")
 
+@app.get("/api/musicjam/enhancements/{enhancement_id}")
+async def get_musicjam_enhancement(enhancement_id: str):
+    """Get a MusicJam AI enhancement including the full AI suggestion"""
+    enhancement = await db.musicjam_enhancements.find_one({"id": enhancement_id}, {"_id": 0})
+    if not enhancement:
+        raise HTTPException(status_code=404, detail="Enhancement not found")
+    try:
+        return await with_ai_suggestion(enhancement)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch enhancement: {str(e)}")
+
+@app.get("/api/musicjam/enhancements/{enhancement_id}/ai-suggestion")
+async def get_musicjam_enhancement_suggestion(enhancement_id: str, request: Request):
+    """Get the full AI suggestion as markdown, gzip-encoded when the client accepts it"""
+    enhancement = await db.musicjam_enhancements.find_one({"id": enhancement_id}, {"_id": 0, "ai_suggestion": 1})
+    if enhancement is None:
+        raise HTTPException(status_code=404, detail="Enhancement not found")
+    try:
+        return await generated_text_response(
+            request, "ai_suggestion", enhancement_id, enhancement.get("ai_suggestion")
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch AI suggestion: {str(e)}")
+
 # Deployment Routes
+DEPLOY_WAIT_POLL_SECONDS = 0.25
+
 @app.post("/api/deploy/enhancement")
-async def deploy_enhancement(deployment_request: dict):
-    """Deploy a specific AI enhancement to MusicJam"""
+async def deploy_enhancement(
+    deployment_request: dict,
+    refresh: bool = False,
+    wait: float = Query(0, ge=0, le=60)
+):
+    """Deploy a specific AI enhancement to MusicJam.
+
+    The deployment is recorded immediately in the ``planning`` state and its plan is
+    generated by a job worker; poll /api/deploy/status/{deployment_id}, or pass
+    ``wait`` (seconds) to block until the plan is ready.
+    """
+    enhancement_id = deployment_request.get("enhancement_id")
+    deployment_target = deployment_request.get("deployment_target", "staging")
+    
+    if not enhancement_id:
+        raise HTTPException(status_code=400, detail="enhancement_id is required")
+    
     try:
-        enhancement_id = deployment_request.get("enhancement_id")
-        deployment_target = deployment_request.get("deployment_target", "staging")
-        
-        if not enhancement_id:
-            raise HTTPException(status_code=400, detail="enhancement_id is required")
-            
         # Get enhancement from database
-        enhancement = await db.musicjam_enhancements.find_one({"id": enhancement_id}, {"_id": 0})
-        if not enhancement:
+        if not await db.musicjam_enhancements.count_documents({"id": enhancement_id}, limit=1):
             raise HTTPException(status_code=404, detail="Enhancement not found")
         
-        # Create deployment plan
-        deployment_plan = await create_deployment_plan(enhancement)
-        
-        # Create deployment record
-        deployment = {
-            "id": str(uuid.uuid4()),
+        # Create deployment record and queue plan generation
+        deployment = await save_deployment(enhancement_id, deployment_target, {}, status="planning")
+        job_id = await enqueue_job("plan_deployment", {
+            "deployment_id": deployment["id"],
             "enhancement_id": enhancement_id,
-            "target": deployment_target,
-            "status": "deploying",
-            "deployment_plan": deployment_plan,
-            "created_at": datetime.now().isoformat()
-        }
+            "refresh": refresh
+        })
         
-        await db.deployments.insert_one(deployment)
+        if wait:
+            deadline = time.monotonic() + wait
+            while time.monotonic() < deadline:
+                current = await db.deployments.find_one({"id": deployment["id"]}, {"_id": 0})
+                if current and current["status"] != "planning":
+                    current = await with_deployment_plan(current)
+                    return {
+                        "deployment_id": deployment["id"],
+                        "status": current["status"],
+                        "deployment_plan": current["deployment_plan"],
+                        "target": deployment_target
+                    }
+                await asyncio.sleep(DEPLOY_WAIT_POLL_SECONDS)
         
         return {
             "deployment_id": deployment["id"],
-            "status": "initiated",
-            "deployment_plan": deployment_plan,
+            "status": "planning",
+            "job_id": job_id,
             "target": deployment_target
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Deployment failed: {str(e)}")
 
-async def create_deployment_plan(enhancement):
-    """Create a detailed deployment plan using AI"""
-    if not GEMINI_API_KEY:
-        return {"plan": "AI deployment planning not available - Gemini API not configured"}
+async def plan_deployment(payload: dict):
+    """Job handler that generates the plan for a deployment recorded in ``planning``"""
+    enhancement = await db.musicjam_enhancements.find_one({"id": payload["enhancement_id"]}, {"_id": 0})
+    if not enhancement:
+        raise ValueError(f"Enhancement {payload['enhancement_id']} not found")
+    enhancement = await with_ai_suggestion(enhancement)
     
-    try:
-        prompt = f"""
+    deployment_plan = await create_deployment_plan(enhancement, refresh=payload.get("refresh", False))
+    await finish_deployment_plan(payload["deployment_id"], deployment_plan, "deploying")
+
+async def fail_deployment_plan(payload: dict, error: Exception):
+    await finish_deployment_plan(
+        payload["deployment_id"], {"plan": f"AI deployment planning failed: {str(error)}"}, "failed"
+    )
+
+async def finish_deployment_plan(deployment_id: str, deployment_plan: Dict[str, Any], status: str):
+    await store_generated_text("deployment_plan", deployment_id, deployment_plan.get("plan", ""))
+    changes = {
+        "status": status,
+        "deployment_plan": {k: v for k, v in deployment_plan.items() if k != "plan"},
+        "updated_at": datetime.now().isoformat()
+    }
+    result = await db.deployments.update_one(
+        {"id": deployment_id, "status": "planning"},
+        {"$set": changes}
+    )
+    if result.modified_count:
+        await record_transition("deployments", "planning", status)
+        await record_change("deployments", "update", deployment_id, changes)
+
+DEPLOYMENT_PLAN_PROMPT = """
         Create a detailed deployment plan for this MusicJam enhancement:
         
-        Feature: {enhancement['feature_name']}
-        Type: {enhancement['enhancement_type']}
-        AI Suggestion: {enhancement['ai_suggestion'][:1000]}...
+        Feature: {feature_name}
+        Type: {enhancement_type}
+        AI Suggestion: {ai_suggestion}...
         
         Generate a step-by-step deployment plan including:
         1. Prerequisites and dependencies
@@ -390,41 +2117,121 @@ async def create_deployment_plan(enhancement):
         
         Make it actionable and specific for a React/FastAPI/MongoDB stack.
         """
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
-        
-        return {
-            "plan": response.text,
+
+@app.post("/api/deploy/enhancement/stream")
+async def stream_deploy_enhancement(deployment_request: dict, request: Request, refresh: bool = False):
+    """Stream the AI deployment plan as Server-Sent Events, then record the deployment"""
+    enhancement_id = deployment_request.get("enhancement_id")
+    deployment_target = deployment_request.get("deployment_target", "staging")
+
+    if not enhancement_id:
+        raise HTTPException(status_code=400, detail="enhancement_id is required")
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=400, detail="Gemini AI not configured")
+
+    enhancement = await db.musicjam_enhancements.find_one({"id": enhancement_id}, {"_id": 0})
+    if not enhancement:
+        raise HTTPException(status_code=404, detail="Enhancement not found")
+    enhancement = await with_ai_suggestion(enhancement)
+
+    async def deployment_done(ai_text: str):
+        deployment = await save_deployment(enhancement_id, deployment_target, {
+            "plan": ai_text,
             "estimated_duration": "2-4 hours",
             "complexity": "medium",
             "risk_level": "low"
+        })
+        return {
+            "deployment_id": deployment["id"],
+            "status": "initiated",
+            "target": deployment_target
         }
-    except Exception as e:
-        return {"plan": f"AI deployment planning failed: {str(e)}"}
 
-@app.get("/api/deploy/status")
-async def get_deployment_status():
-    """Get status of all deployments"""
+    events = stream_cached(request, "deployment_plan", DEPLOYMENT_PLAN_PROMPT, {
+        "feature_name": enhancement['feature_name'],
+        "enhancement_type": enhancement['enhancement_type'],
+        "ai_suggestion": enhancement['ai_suggestion'][:1000],
+    }, deployment_done, refresh=refresh)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def create_deployment_plan(enhancement, refresh: bool = False):
+    """Create a detailed deployment plan using AI"""
+    if not GEMINI_API_KEY:
+        return {"plan": "AI deployment planning not available - Gemini API not configured"}
+    
+    # Generation errors propagate so the job queue retries them and, once attempts
+    # run out, fail_deployment_plan marks the deployment failed
+    ai_text, _ = await generate_cached("deployment_plan", DEPLOYMENT_PLAN_PROMPT, {
+        "feature_name": enhancement['feature_name'],
+        "enhancement_type": enhancement['enhancement_type'],
+        "ai_suggestion": enhancement['ai_suggestion'][:1000],
+    }, refresh=refresh)
+    
+    return {
+        "plan": ai_text,
+        "estimated_duration": "2-4 hours",
+        "complexity": "medium",
+        "risk_level": "low"
+    }
+
+JOB_HANDLERS = {
+    "deploy_project": process_deployment,
+    "plan_deployment": plan_deployment,
+}
+JOB_FAILURE_HANDLERS = {
+    "deploy_project": fail_deployment,
+    "plan_deployment": fail_deployment_plan,
+}
+
+@app.get("/api/deploy/status", response_model=DeploymentPage)
+async def get_deployment_status(
+    response: Response,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    fields: Optional[str] = None
+):
+    """Get status of deployments, one keyset page at a time"""
+    after = decode_cursor(cursor, "created_at")
+    projection = list_projection(fields, view, DEPLOYMENT_SUMMARY_FIELDS, "created_at")
     try:
-        deployments = await db.deployments.find({}, {"_id": 0}).to_list(100)
-        return {"deployments": deployments}
+        deployments, next_cursor = await fetch_page(
+            db.deployments, {}, "created_at", limit, after, projection
+        )
+        return page_response(response, deployments=deployments, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch deployments: {str(e)}")
 
-@app.post("/api/generate/component")
-async def generate_react_component(component_request: dict):
-    """Generate React component code for MusicJam enhancement"""
-    if not GEMINI_API_KEY:
-        raise HTTPException(status_code=400, detail="Gemini AI not configured")
-    
+@app.get("/api/deploy/status/{deployment_id}")
+async def get_deployment(deployment_id: str):
+    """Get a deployment including the full AI deployment plan"""
+    deployment = await db.deployments.find_one({"id": deployment_id}, {"_id": 0})
+    if not deployment:
+        raise HTTPException(status_code=404, detail="Deployment not found")
+    try:
+        return await with_deployment_plan(deployment)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch deployment: {str(e)}")
+
+@app.get("/api/deploy/status/{deployment_id}/plan")
+async def get_deployment_plan_text(deployment_id: str, request: Request):
+    """Get the full AI deployment plan as markdown, gzip-encoded when the client accepts it"""
+    deployment = await db.deployments.find_one({"id": deployment_id}, {"_id": 0, "deployment_plan.plan": 1})
+    if deployment is None:
+        raise HTTPException(status_code=404, detail="Deployment not found")
     try:
-        prompt = f"""
+        return await generated_text_response(
+            request, "deployment_plan", deployment_id, deployment.get("deployment_plan", {}).get("plan")
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch deployment plan: {str(e)}")
+
+COMPONENT_PROMPT = """
         Generate a complete React component for MusicJam with the following requirements:
         
-        Component Name: {component_request.get('component_name', 'EnhancedFeature')}
-        Feature Type: {component_request.get('feature_type', 'general')}
-        Description: {component_request.get('description', 'No description provided')}
+        Component Name: {component_name}
+        Feature Type: {feature_type}
+        Description: {description}
         
         Requirements:
         - Use modern React hooks (useState, useEffect)
@@ -438,39 +2245,78 @@ async def generate_react_component(component_request: dict):
         
         Generate complete, production-ready component code.
         """
-        
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
+
+@app.post("/api/generate/component")
+async def generate_react_component(component_request: dict, refresh: bool = False):
+    """Generate React component code for MusicJam enhancement"""
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=400, detail="Gemini AI not configured")
+    
+    try:
+        ai_text, cached = await generate_cached("component", COMPONENT_PROMPT, {
+            "component_name": component_request.get('component_name', 'EnhancedFeature'),
+            "feature_type": component_request.get('feature_type', 'general'),
+            "description": component_request.get('description', 'No description provided'),
+        }, refresh=refresh)
         
         return {
-            "component_code": response.text,
+            "component_code": ai_text,
             "component_name": component_request.get('component_name', 'EnhancedFeature'),
+            "cached": cached,
             "generated_at": datetime.now().isoformat()
         }
+    except AIGenerationTimeout as e:
+        raise HTTPException(status_code=504, detail=f"Component generation failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Component generation failed: {str(e)}")
 
+@app.post("/api/generate/component/stream")
+async def stream_react_component(component_request: dict, request: Request, refresh: bool = False):
+    """Stream generated React component code as Server-Sent Events"""
+    if not GEMINI_API_KEY:
+        raise HTTPException(status_code=400, detail="Gemini AI not configured")
+
+    component_name = component_request.get('component_name', 'EnhancedFeature')
+
+    async def component_done(ai_text: str):
+        return {
+            "component_name": component_name,
+            "generated_at": datetime.now().isoformat()
+        }
+
+    events = stream_cached(request, "component", COMPONENT_PROMPT, {
+        "component_name": component_name,
+        "feature_type": component_request.get('feature_type', 'general'),
+        "description": component_request.get('description', 'No description provided'),
+    }, component_done, refresh=refresh)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/api/musicjam/simulate-deploy")
 async def simulate_musicjam_deployment(enhancement_id: str):
     """Simulate deployment to MusicJam for testing"""
     try:
-        enhancement = await db.musicjam_enhancements.find_one({"id": enhancement_id}, {"_id": 0})
+        # Update enhancement status, reading the previous status atomically
+        changes = {
+            "implementation_status": "implementing", 
+            "deployment_simulation": {
+                "simulated_at": datetime.now().isoformat(),
+                "status": "success",
+                "target_url": "https://musicjam.yazwho.com/",
+                "estimated_impact": "High user engagement improvement"
+            }
+        }
+        enhancement = await db.musicjam_enhancements.find_one_and_update(
+            {"id": enhancement_id},
+            {"$set": changes},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
         if not enhancement:
             raise HTTPException(status_code=404, detail="Enhancement not found")
-        
-        # Update enhancement status
-        await db.musicjam_enhancements.update_one(
-            {"id": enhancement_id},
-            {"$set": {
-                "implementation_status": "implementing", 
-                "deployment_simulation": {
-                    "simulated_at": datetime.now().isoformat(),
-                    "status": "success",
-                    "target_url": "https://musicjam.yazwho.com/",
-                    "estimated_impact": "High user engagement improvement"
-                }
-            }}
+        await record_transition(
+            "musicjam_enhancements", enhancement.get("implementation_status", "planned"), "implementing"
         )
+        await record_change("musicjam_enhancements", "update", enhancement_id, changes)
         
         return {
             "status": "simulation_complete",
@@ -483,11 +2329,59 @@ async def simulate_musicjam_deployment(enhancement_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 # MusicJam Application Routes
+# date/start_time/end_time stay as submitted; starts_at/ends_at are the normalized UTC
+# datetimes that queries, sorting and the status sweeper use.
+JAM_SESSION_TIMEZONE = ZoneInfo(os.getenv("JAM_SESSION_TIMEZONE", "UTC"))
+JAM_SESSION_DEFAULT_HOURS = float(os.getenv("JAM_SESSION_DEFAULT_HOURS", "3"))
+
+def parse_session_time(day: str, clock: str) -> datetime:
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"):
+        try:
+            local = datetime.strptime(f"{day.strip()} {clock.strip()}", fmt)
+        except ValueError:
+            continue
+        return local.replace(tzinfo=JAM_SESSION_TIMEZONE).astimezone(timezone.utc)
+    raise ValueError(f"expected date YYYY-MM-DD and time HH:MM, got {day!r} {clock!r}")
+
+def session_window(day: str, start_time: str, end_time: Optional[str]) -> tuple:
+    """(starts_at, ends_at) in UTC; a missing end gets the default length, an earlier one rolls to the next day"""
+    starts_at = parse_session_time(day, start_time)
+    if not end_time:
+        return starts_at, starts_at + timedelta(hours=JAM_SESSION_DEFAULT_HOURS)
+    ends_at = parse_session_time(day, end_time)
+    if ends_at <= starts_at:
+        ends_at += timedelta(days=1)
+    return starts_at, ends_at
+
+def with_session_window(jam_session: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill starts_at/ends_at on documents written before they existed (until migrated)"""
+    if jam_session.get("starts_at") is None and jam_session.get("date") and jam_session.get("start_time"):
+        try:
+            jam_session["starts_at"], jam_session["ends_at"] = session_window(
+                jam_session["date"], jam_session["start_time"], jam_session.get("end_time")
+            )
+        except ValueError:
+            pass
+    return jam_session
+
+class GeoPoint(BaseModel):
+    type: str = Field("Point", pattern="^Point$")
+    coordinates: List[float] = Field(..., min_length=2, max_length=2)  # [longitude, latitude]
+
+    @field_validator("coordinates")
+    @classmethod
+    def check_range(cls, coordinates: List[float]) -> List[float]:
+        longitude, latitude = coordinates
+        if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+            raise ValueError("coordinates must be [longitude, latitude] within valid ranges")
+        return coordinates
+
 class JamSession(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     description: str
     location: str
+    geo: Optional[GeoPoint] = None  # filled by the geocode-jam-sessions command when omitted
     max_participants: Optional[int] = None
     date: str
     start_time: str
@@ -496,9 +2390,16 @@ class JamSession(BaseModel):
     genres: List[str] = []
     tab_playlist_id: Optional[str] = None
     status: str = "upcoming"  # upcoming, ongoing, completed
+    starts_at: Optional[datetime] = None  # derived from date/start_time
+    ends_at: Optional[datetime] = None  # derived from date/end_time
     created_by: str = "user"
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
 
+    @model_validator(mode="after")
+    def normalize_schedule(self):
+        self.starts_at, self.ends_at = session_window(self.date, self.start_time, self.end_time)
+        return self
+
 class TabPlaylist(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -508,23 +2409,53 @@ class TabPlaylist(BaseModel):
     created_by: str = "user"
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
 
-@app.get("/api/musicjam/jam-sessions")
+class JamSessionPage(BaseModel):
+    jam_sessions: List[JamSession]
+    next_cursor: Optional[str] = None
+
+class PlaylistPage(BaseModel):
+    playlists: List[TabPlaylist]
+    next_cursor: Optional[str] = None
+
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def jam_session_query(status: Optional[str], genre: Optional[str],
+                      starts_from: Optional[datetime] = None, starts_to: Optional[datetime] = None) -> Dict[str, Any]:
+    query = {}
+    if status and status != "All":
+        query["status"] = status.lower()
+    if genre and genre != "All Genres":
+        query["genres"] = {"$in": [genre]}
+    window = {}
+    if starts_from:
+        window["$gte"] = as_utc(starts_from)
+    if starts_to:
+        window["$lt"] = as_utc(starts_to)
+    if window:
+        query["starts_at"] = window
+    return query
+
+@app.get("/api/musicjam/jam-sessions", response_model=JamSessionPage,
+         dependencies=[conditional_get("jam_sessions")])
 async def get_jam_sessions(
+    response: Response,
     status: Optional[str] = None,
     genre: Optional[str] = None,
-    sort_by: Optional[str] = "date"
+    sort_by: Optional[str] = "date",
+    starts_from: Optional[datetime] = Query(None, alias="from"),
+    starts_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None
 ):
-    """Get jam sessions with filtering and sorting"""
+    """Get jam sessions with filtering and sorting; from/to select sessions starting in [from, to)"""
+    sort_field = "starts_at" if sort_by == "date" else "created_at"
+    after = decode_cursor(cursor, sort_field)
     try:
-        query = {}
-        if status and status != "All":
-            query["status"] = status.lower()
-        if genre and genre != "All Genres":
-            query["genres"] = {"$in": [genre]}
-        
-        sort_field = "date" if sort_by == "date" else "created_at"
-        jam_sessions = await db.jam_sessions.find(query, {"_id": 0}).sort(sort_field, 1).to_list(100)
-        return {"jam_sessions": jam_sessions}
+        query = jam_session_query(status, genre, starts_from, starts_to)
+        jam_sessions, next_cursor = await fetch_page(db.jam_sessions, query, sort_field, limit, after)
+        jam_sessions = [with_session_window(jam_session) for jam_session in jam_sessions]
+        return page_response(response, jam_sessions=jam_sessions, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch jam sessions: {str(e)}")
 
@@ -532,11 +2463,51 @@ async def get_jam_sessions(
 async def create_jam_session(jam_session: JamSession):
     """Create a new jam session"""
     try:
-        await db.jam_sessions.insert_one(jam_session.dict())
+        await db.jam_sessions.insert_one(jam_session.model_dump())
+        await record_insert("jam_sessions", jam_session.status)
+        await record_change("jam_sessions", "insert", jam_session.id, jam_session.model_dump())
         return {"message": "Jam session created successfully", "id": jam_session.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create jam session: {str(e)}")
 
+@app.post("/api/musicjam/jam-sessions/bulk")
+async def bulk_create_jam_sessions(request: Request):
+    """Create jam sessions from a JSON array or NDJSON body, reporting each item's outcome"""
+    try:
+        return await bulk_ingest(request, JamSession, "jam_sessions")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk jam session import failed: {str(e)}")
+
+@app.get("/api/musicjam/jam-sessions/nearby")
+async def get_nearby_jam_sessions(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    status: Optional[str] = None,
+    genre: Optional[str] = None,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT)
+):
+    """Get geocoded jam sessions within radius_km of a point, nearest first"""
+    try:
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "key": "geo",
+                "distanceField": "distance_m",
+                "maxDistance": radius_km * 1000,
+                "spherical": True,
+                "query": jam_session_query(status, genre)
+            }},
+            {"$limit": limit},
+            {"$project": {"_id": 0}}
+        ]
+        jam_sessions = await db.jam_sessions.aggregate(pipeline).to_list(limit)
+        return {"jam_sessions": jam_sessions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch nearby jam sessions: {str(e)}")
+
 @app.get("/api/musicjam/jam-sessions/{session_id}")
 async def get_jam_session(session_id: str):
     """Get specific jam session details"""
@@ -544,16 +2515,22 @@ async def get_jam_session(session_id: str):
         jam_session = await db.jam_sessions.find_one({"id": session_id}, {"_id": 0})
         if not jam_session:
             raise HTTPException(status_code=404, detail="Jam session not found")
-        return jam_session
+        return with_session_window(jam_session)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch jam session: {str(e)}")
 
-@app.get("/api/musicjam/playlists")
-async def get_playlists():
-    """Get all tab playlists"""
+@app.get("/api/musicjam/playlists", response_model=PlaylistPage,
+         dependencies=[conditional_get("tab_playlists")])
+async def get_playlists(
+    response: Response,
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None
+):
+    """Get tab playlists, one keyset page at a time"""
+    after = decode_cursor(cursor, "created_at")
     try:
-        playlists = await db.tab_playlists.find({}, {"_id": 0}).to_list(100)
-        return {"playlists": playlists}
+        playlists, next_cursor = await fetch_page(db.tab_playlists, {}, "created_at", limit, after)
+        return page_response(response, playlists=playlists, next_cursor=next_cursor)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch playlists: {str(e)}")
 
@@ -561,12 +2538,24 @@ async def get_playlists():
 async def create_playlist(playlist: TabPlaylist):
     """Create a new tab playlist"""
     try:
-        await db.tab_playlists.insert_one(playlist.dict())
+        await db.tab_playlists.insert_one(playlist.model_dump())
+        await record_insert("tab_playlists")
+        await record_change("tab_playlists", "insert", playlist.id, playlist.model_dump())
         return {"message": "Playlist created successfully", "id": playlist.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create playlist: {str(e)}")
 
-@app.get("/api/musicjam/genres")
+@app.post("/api/musicjam/playlists/bulk")
+async def bulk_create_playlists(request: Request):
+    """Create tab playlists from a JSON array or NDJSON body, reporting each item's outcome"""
+    try:
+        return await bulk_ingest(request, TabPlaylist, "tab_playlists")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk playlist import failed: {str(e)}")
+
+@app.get("/api/musicjam/genres", dependencies=[conditional_get(max_age=86400)])
 async def get_genres():
     """Get available music genres"""
     genres = [
@@ -576,6 +2565,925 @@ async def get_genres():
     ]
     return {"genres": genres}
 
-if __name__ == "__main__":
+# Search
+# $text queries against the weighted "search_text" index of each collection, merged by
+# relevance score. Text scores cannot be used as a keyset, so results page by offset
+# up to SEARCH_MAX_OFFSET.
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+SEARCH_TYPES = {"jam_session": "jam_sessions", "playlist": "tab_playlists"}
+
+async def search_collection(collection: str, query: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    score = {"score": {"$meta": "textScore"}}
+    cursor = db[collection].find(query, {"_id": 0, **score}).sort([("score", {"$meta": "textScore"}), ("id", ASCENDING)])
+    return await cursor.to_list(limit)
+
+@app.get("/api/musicjam/search")
+async def search_musicjam(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, pattern="^(jam_session|playlist)$"),
+    status: Optional[str] = None,
+    genre: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=PAGE_MAX_LIMIT),
+    offset: int = Query(0, ge=0)
+):
+    """Search jam sessions and playlists by relevance across titles, descriptions, locations and tabs"""
+    if offset > SEARCH_MAX_OFFSET:
+        raise HTTPException(status_code=400, detail=f"offset may not exceed {SEARCH_MAX_OFFSET}; refine the search instead")
+    types = [type] if type else list(SEARCH_TYPES)
+    if status and status != "All":
+        # Only jam sessions have a status
+        types = [t for t in types if t == "jam_session"]
+    try:
+        searches = []
+        for result_type in types:
+            if result_type == "jam_session":
+                query = jam_session_query(status, genre)
+            else:
+                query = {"genres": {"$in": [genre]}} if genre and genre != "All Genres" else {}
+            query["$text"] = {"$search": q}
+            searches.append(search_collection(SEARCH_TYPES[result_type], query, offset + limit + 1))
+
+        results = []
+        for result_type, docs in zip(types, await asyncio.gather(*searches)):
+            results.extend({"type": result_type, **doc} for doc in docs)
+        results.sort(key=lambda doc: (-doc["score"], doc["id"]))
+        page = results[offset:offset + limit]
+        return {
+            "results": page,
+            "offset": offset,
+            "next_offset": offset + limit if len(results) > offset + limit else None
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+# Streaming export
+# Documents are streamed from the cursor in _id order (always indexed) and flushed in
+# ~64KB NDJSON chunks, so memory stays flat regardless of collection size.
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_DATASETS = {
+    "jam-sessions": "jam_sessions",
+    "playlists": "tab_playlists",
+    "enhancements": "musicjam_enhancements",
+    "deployments": "deployments",
+    "projects": "projects",
+}
+
+async def stream_ndjson(collection, query: Dict[str, Any]):
+    cursor = collection.find(query, {"_id": 0}).sort("_id", ASCENDING).batch_size(EXPORT_BATCH_SIZE)
+    buffer = bytearray()
+    try:
+        async for doc in cursor:
+            buffer += orjson.dumps(doc, default=str, option=orjson.OPT_NAIVE_UTC)
+            buffer += b"\n"
+            if len(buffer) >= EXPORT_FLUSH_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        await cursor.close()
+
+def export_collection(dataset: str) -> str:
+    collection = EXPORT_DATASETS.get(dataset)
+    if not collection:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown export '{dataset}', expected one of: {', '.join(EXPORT_DATASETS)}"
+        )
+    return collection
+
+def export_query(collection: str, status: Optional[str], genre: Optional[str],
+                 starts_from: Optional[datetime], starts_to: Optional[datetime]) -> Dict[str, Any]:
+    if collection == "jam_sessions":
+        return jam_session_query(status, genre, starts_from, starts_to)
+    status_field = COUNTED_COLLECTIONS.get(collection)
+    return {status_field: status.lower()} if status and status_field else {}
+
+@app.get("/api/export/{dataset}")
+async def export_dataset(
+    dataset: str,
+    status: Optional[str] = None,
+    genre: Optional[str] = None,
+    starts_from: Optional[datetime] = Query(None, alias="from"),
+    starts_to: Optional[datetime] = Query(None, alias="to")
+):
+    """Stream a whole collection as NDJSON; jam-sessions accepts the same filters as the list endpoint"""
+    collection = export_collection(dataset)
+    query = export_query(collection, status, genre, starts_from, starts_to)
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.ndjson"
+    return StreamingResponse(
+        stream_ndjson(db[collection], query),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Columnar export
+# Collections are read off the cursor PARQUET_CHUNK_SIZE documents at a time; each chunk
+# becomes one pandas frame and Arrow table with a fixed per-collection schema, so
+# memory is bounded by the chunk and every file/row group shares the same columns.
+# Nested values without a natural column type are kept as JSON strings. Conversion
+# and writing run in a thread while the next chunk is fetched. The CLI writes Hive-style
+# partitioned datasets (created_month=YYYY-MM); the endpoint streams a single file.
+PARQUET_CHUNK_SIZE = int(os.getenv("PARQUET_CHUNK_SIZE", "50000"))
+PARQUET_EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", "exports")
+PARQUET_COLUMNS = {
+    "jam_sessions": {
+        "id": "string", "title": "string", "description": "string", "location": "string", "geo": "json",
+        "max_participants": "int", "date": "string", "start_time": "string", "end_time": "string",
+        "skill_level": "string", "genres": "list", "tab_playlist_id": "string", "status": "string",
+        "starts_at": "timestamp", "ends_at": "timestamp", "created_by": "string", "created_at": "string",
+    },
+    "tab_playlists": {
+        "id": "string", "title": "string", "description": "string", "tabs": "json", "genres": "list",
+        "created_by": "string", "created_at": "string",
+    },
+    "projects": {
+        "id": "string", "name": "string", "repository_url": "string", "description": "string", "status": "string",
+        "deployment_url": "string", "created_at": "string", "updated_at": "string",
+    },
+    "deployments": {
+        "id": "string", "enhancement_id": "string", "target": "string", "status": "string",
+        "deployment_plan": "json", "created_at": "string", "updated_at": "string",
+    },
+    "musicjam_enhancements": {
+        "id": "string", "feature_name": "string", "enhancement_type": "string", "ai_suggestion_preview": "string",
+        "implementation_status": "string", "deployment_simulation": "json", "created_at": "string",
+    },
+}
+
+def parquet_schema(collection: str, partitioned: bool = False):
+    import pyarrow as pa
+
+    types = {
+        "string": pa.string(), "json": pa.string(), "int": pa.int64(),
+        "timestamp": pa.timestamp("ms", tz="UTC"), "list": pa.list_(pa.string()),
+    }
+    fields = [pa.field(name, types[kind]) for name, kind in PARQUET_COLUMNS[collection].items()]
+    if partitioned:
+        fields.append(pa.field("created_month", pa.string()))
+    return pa.schema(fields)
+
+def parquet_table(collection: str, docs: List[Dict[str, Any]], partitioned: bool = False):
+    """Convert one chunk of documents to an Arrow table, coercing stray types to the schema"""
+    import pandas as pd
+    import pyarrow as pa
+
+    def as_text(value):
+        if value is None or (isinstance(value, float) and value != value):
+            return None
+        return value if isinstance(value, str) else str(value)
+
+    columns = PARQUET_COLUMNS[collection]
+    frame = pd.DataFrame.from_records(docs, columns=list(columns))
+    for name, kind in columns.items():
+        if kind == "string":
+            frame[name] = frame[name].map(as_text)
+        elif kind == "json":
+            frame[name] = frame[name].map(
+                lambda v: orjson.dumps(v, default=str).decode() if isinstance(v, (dict, list)) else None
+            )
+        elif kind == "list":
+            frame[name] = frame[name].map(lambda v: [str(item) for item in v] if isinstance(v, list) else None)
+        elif kind == "int":
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("Int64")
+        elif kind == "timestamp":
+            frame[name] = pd.to_datetime(frame[name], errors="coerce", utc=True)
+    if partitioned:
+        frame["created_month"] = frame["created_at"].str.slice(0, 7).fillna("unknown")
+    return pa.Table.from_pandas(frame, schema=parquet_schema(collection, partitioned), preserve_index=False)
+
+async def document_chunks(collection: str, query: Dict[str, Any], chunk_size: int):
+    projection = {"_id": 0, **{name: 1 for name in PARQUET_COLUMNS[collection]}}
+    cursor = db[collection].find(query, projection).sort("_id", ASCENDING).batch_size(min(chunk_size, 10000))
+    chunk = []
+    try:
+        async for doc in cursor:
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        await cursor.close()
+
+async def pipeline_chunks(collection: str, query: Dict[str, Any], chunk_size: int, write):
+    """Run ``write(docs)`` in a thread for each chunk, fetching the next chunk meanwhile"""
+    chunks = document_chunks(collection, query, chunk_size)
+    pending = None
+    try:
+        async for docs in chunks:
+            if pending:
+                yield await pending
+            pending = asyncio.ensure_future(asyncio.to_thread(write, docs))
+        if pending:
+            yield await pending
+            pending = None
+    finally:
+        if pending:
+            await asyncio.gather(pending, return_exceptions=True)
+        await chunks.aclose()
+
+async def export_parquet_dataset(collection: str, out_dir: str, query: Optional[Dict[str, Any]] = None,
+                                 chunk_size: int = PARQUET_CHUNK_SIZE) -> Dict[str, Any]:
+    """Write a collection as a created_month-partitioned Parquet dataset under out_dir/<collection>/<stamp>"""
+    import pyarrow.parquet as pq
+
+    root = os.path.join(out_dir, collection, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    chunk_index = 0
+
+    def write(docs):
+        nonlocal chunk_index
+        index, chunk_index = chunk_index, chunk_index + 1
+        pq.write_to_dataset(
+            parquet_table(collection, docs, partitioned=True), root,
+            partition_cols=["created_month"],
+            basename_template=f"part-{index:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        return len(docs)
+
+    started = time.perf_counter()
+    rows = 0
+    async for written in pipeline_chunks(collection, query or {}, chunk_size, write):
+        rows += written
+    return {"collection": collection, "path": root, "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+class ParquetStreamSink:
+    """Append-only file object for ParquetWriter; written bytes are drained to the response"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.buffer += data
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+async def stream_parquet(collection: str, query: Dict[str, Any]):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = ParquetStreamSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), parquet_schema(collection))
+
+    def write(docs):
+        # Chunks are written one at a time (the pipeline awaits each before the next)
+        writer.write_table(parquet_table(collection, docs))
+        return sink.drain()
+
+    chunks = pipeline_chunks(collection, query, PARQUET_CHUNK_SIZE, write)
+    try:
+        async for data in chunks:
+            if data:
+                yield data
+    finally:
+        await chunks.aclose()
+        writer.close()
+    yield sink.drain()
+
+@app.get("/api/export/{dataset}/parquet")
+async def export_dataset_parquet(
+    dataset: str,
+    status: Optional[str] = None,
+    genre: Optional[str] = None,
+    starts_from: Optional[datetime] = Query(None, alias="from"),
+    starts_to: Optional[datetime] = Query(None, alias="to")
+):
+    """Stream a collection as a single Parquet file (one row group per chunk)"""
+    collection = export_collection(dataset)
+    query = export_query(collection, status, genre, starts_from, starts_to)
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.parquet"
+    return StreamingResponse(
+        stream_parquet(collection, query),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Jam session status sweeper
+# Moves sessions along upcoming -> ongoing -> completed from starts_at/ends_at. Each
+# transition is applied in batches of ids with a status-guarded update_many, so
+# concurrent sweepers never double count and counters move by modified_count.
+JAM_SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("JAM_SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+JAM_SESSION_SWEEP_BATCH_SIZE = 1000
+
+async def sweep_jam_session_statuses() -> Dict[str, int]:
+    now = datetime.now(timezone.utc)
+    transitions = [
+        ("upcoming", "completed", {"ends_at": {"$lte": now}}),
+        ("upcoming", "ongoing", {"starts_at": {"$lte": now}}),
+        ("ongoing", "completed", {"ends_at": {"$lte": now}}),
+    ]
+    moved = {}
+    for old_status, new_status, due in transitions:
+        query = {"status": old_status, **due}
+        count = 0
+        while True:
+            batch = await db.jam_sessions.find(query, {"_id": 1}).limit(JAM_SESSION_SWEEP_BATCH_SIZE) \
+                .to_list(JAM_SESSION_SWEEP_BATCH_SIZE)
+            if not batch:
+                break
+            result = await db.jam_sessions.update_many(
+                {"_id": {"$in": [doc["_id"] for doc in batch]}, "status": old_status},
+                {"$set": {"status": new_status}}
+            )
+            count += result.modified_count
+            if len(batch) < JAM_SESSION_SWEEP_BATCH_SIZE:
+                break
+        if count:
+            await bump_counters({f"jam_sessions.{old_status}": -count, f"jam_sessions.{new_status}": count})
+            moved[f"{old_status}->{new_status}"] = count
+    if moved:
+        await record_change("jam_sessions", "bulk_update", None, moved)
+    return moved
+
+# Analytics rollups
+# Chart data is materialized on a schedule and endpoints only read the stored rollups.
+# Snapshot reports are full recomputes, not incremental: when the collection version
+# moved since the last rollup (any insert, sweep, migration batch or geocode moves it)
+# the whole-collection $facet runs again. Their cost is therefore bounded by the
+# refresh interval, not by the size of the change. Weekly outcome reports are kept as
+# one document per (report, ISO week) in analytics_weekly; each refresh re-aggregates
+# whole weeks from ANALYTICS_LOOKBACK_DAYS before the previous refresh onwards, so
+# late status changes inside that window are picked up and older weeks are left alone.
+ANALYTICS_REFRESH_INTERVAL_SECONDS = float(os.getenv("ANALYTICS_REFRESH_INTERVAL_SECONDS", "300"))
+ANALYTICS_LOOKBACK_DAYS = int(os.getenv("ANALYTICS_LOOKBACK_DAYS", "14"))
+PLAYLIST_SIZE_BOUNDARIES = [0, 1, 5, 10, 25, 50]
+
+ISO_WEEK = {"year": {"$isoWeekYear": "$_week_date"}, "week": {"$isoWeek": "$_week_date"}}
+
+def week_label(key: Dict[str, int]) -> str:
+    return f"{key['year']}-W{key['week']:02d}"
+
+def count_rows(rows: List[Dict[str, Any]], label: str) -> List[Dict[str, Any]]:
+    return [{label: row["_id"], "count": row["count"]} for row in rows]
+
+async def jam_session_rollup() -> Dict[str, Any]:
+    pipeline = [{"$facet": {
+        "by_genre": [
+            {"$unwind": "$genres"},
+            {"$group": {"_id": "$genres", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ],
+        "by_skill_level": [
+            {"$group": {"_id": "$skill_level", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}}
+        ],
+        "by_status": [
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ],
+        "by_week": [
+            {"$match": {"starts_at": {"$type": "date"}}},
+            {"$set": {"_week_date": "$starts_at"}},
+            {"$group": {"_id": ISO_WEEK, "count": {"$sum": 1}}},
+            {"$sort": {"_id.year": 1, "_id.week": 1}}
+        ]
+    }}]
+    facets = (await db.jam_sessions.aggregate(pipeline).to_list(1))[0]
+    return {
+        "by_genre": count_rows(facets["by_genre"], "genre"),
+        "by_skill_level": count_rows(facets["by_skill_level"], "skill_level"),
+        "by_status": count_rows(facets["by_status"], "status"),
+        "by_week": [{"week": week_label(row["_id"]), "count": row["count"]} for row in facets["by_week"]]
+    }
+
+async def playlist_rollup() -> Dict[str, Any]:
+    pipeline = [
+        {"$project": {"size": {"$size": {"$ifNull": ["$tabs", []]}}}},
+        {"$facet": {
+            "sizes": [{"$bucket": {
+                "groupBy": "$size",
+                "boundaries": PLAYLIST_SIZE_BOUNDARIES,
+                "default": f"{PLAYLIST_SIZE_BOUNDARIES[-1]}+",
+                "output": {"count": {"$sum": 1}}
+            }}],
+            "totals": [{"$group": {
+                "_id": None,
+                "playlists": {"$sum": 1},
+                "tabs": {"$sum": "$size"},
+                "avg_tabs": {"$avg": "$size"},
+                "max_tabs": {"$max": "$size"}
+            }}]
+        }}
+    ]
+    facets = (await db.tab_playlists.aggregate(pipeline).to_list(1))[0]
+    labels = {
+        low: str(low) if high - 1 == low else f"{low}-{high - 1}"
+        for low, high in zip(PLAYLIST_SIZE_BOUNDARIES, PLAYLIST_SIZE_BOUNDARIES[1:])
+    }
+    sizes = [{"tabs": labels.get(row["_id"], row["_id"]), "count": row["count"]} for row in facets["sizes"]]
+    totals = facets["totals"][0] if facets["totals"] else {"playlists": 0, "tabs": 0, "avg_tabs": None, "max_tabs": None}
+    totals.pop("_id", None)
+    return {"sizes": sizes, "totals": totals}
+
+SNAPSHOT_REPORTS = {
+    "jam_sessions": ("jam_sessions", jam_session_rollup),
+    "playlists": ("tab_playlists", playlist_rollup),
+}
+# Weekly created/outcome counts; anything neither in progress nor failed counts as a
+# success, reported under the names in "succeeded"/"rate". Nothing moves a deployment
+# past "deploying" (its plan was generated), so that report measures plan generation.
+OUTCOME_REPORTS = {
+    "projects": {"in_progress": ["pending", "deploying"], "succeeded": "succeeded", "rate": "success_rate"},
+    "deployments": {"in_progress": ["planning"], "succeeded": "planned", "rate": "plan_success_rate"},
+}
+
+async def rollup_version(collection: str) -> int:
+    doc = await db.collection_versions.find_one({"_id": collection})
+    return doc["version"] if doc else 0
+
+async def refresh_snapshot_report(report: str, force: bool = False) -> bool:
+    """Recompute a snapshot report in full if its collection changed since the last run"""
+    collection, compute = SNAPSHOT_REPORTS[report]
+    version = await rollup_version(collection)
+    state = await db.analytics_rollups.find_one({"_id": report}, {"version": 1})
+    if state and state.get("version") == version and not force:
+        return False
+    data = await compute()
+    await db.analytics_rollups.replace_one(
+        {"_id": report},
+        {"data": data, "version": version, "refreshed_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+    return True
+
+async def refresh_outcome_report(report: str, force: bool = False) -> bool:
+    version = await rollup_version(report)
+    state = await db.analytics_rollups.find_one({"_id": report}) or {}
+    if state.get("version") == version and not force:
+        return False
+    started = datetime.now()
+    match = {}
+    if state.get("watermark") and not force:
+        since = state["watermark"] - timedelta(days=ANALYTICS_LOOKBACK_DAYS)
+        week_start = (since - timedelta(days=since.weekday())).date()
+        match["created_at"] = {"$gte": week_start.isoformat()}
+
+    in_progress = OUTCOME_REPORTS[report]["in_progress"]
+    pipeline = [
+        {"$match": match},
+        {"$set": {"_week_date": {"$dateFromString": {
+            "dateString": {"$substrBytes": ["$created_at", 0, 10]}, "onError": None
+        }}}},
+        {"$match": {"_week_date": {"$ne": None}}},
+        {"$group": {
+            "_id": ISO_WEEK,
+            "total": {"$sum": 1},
+            "failed": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}},
+            "in_progress": {"$sum": {"$cond": [{"$in": ["$status", in_progress]}, 1, 0]}}
+        }}
+    ]
+    operations = []
+    async for row in db[report].aggregate(pipeline):
+        week = week_label(row["_id"])
+        operations.append(UpdateOne(
+            {"_id": f"{report}:{week}"},
+            {"$set": {
+                "report": report,
+                "week": week,
+                "total": row["total"],
+                "succeeded": row["total"] - row["failed"] - row["in_progress"],
+                "failed": row["failed"],
+                "in_progress": row["in_progress"]
+            }},
+            upsert=True
+        ))
+    if operations:
+        await db.analytics_weekly.bulk_write(operations, ordered=False)
+    await db.analytics_rollups.replace_one(
+        {"_id": report},
+        {"version": version, "watermark": started, "refreshed_at": datetime.now(timezone.utc)},
+        upsert=True
+    )
+    return True
+
+async def refresh_analytics(force: bool = False) -> Dict[str, bool]:
+    """Refresh every rollup whose source changed; returns which reports were recomputed"""
+    refreshed = {}
+    for report in SNAPSHOT_REPORTS:
+        refreshed[report] = await refresh_snapshot_report(report, force)
+    for report in OUTCOME_REPORTS:
+        refreshed[report] = await refresh_outcome_report(report, force)
+    return refreshed
+
+async def weekly_outcomes(report: str, weeks: int) -> Dict[str, Any]:
+    state = await db.analytics_rollups.find_one({"_id": report}, {"refreshed_at": 1}) or {}
+    rows = await db.analytics_weekly.find({"report": report}, {"_id": 0, "report": 0}) \
+        .sort("week", -1).limit(weeks).to_list(weeks)
+    names = OUTCOME_REPORTS[report]
+    for row in rows:
+        succeeded = row.pop("succeeded")
+        finished = succeeded + row["failed"]
+        row[names["succeeded"]] = succeeded
+        row[names["rate"]] = round(succeeded / finished, 4) if finished else None
+    return {"weeks": rows[::-1], "refreshed_at": state.get("refreshed_at")}
+
+async def snapshot_report(report: str) -> Dict[str, Any]:
+    state = await db.analytics_rollups.find_one({"_id": report}) or {}
+    return {**state.get("data", {}), "refreshed_at": state.get("refreshed_at")}
+
+@app.get("/api/analytics/jam-sessions")
+async def get_jam_session_analytics():
+    """Sessions per genre, per week, per skill level and per status"""
+    try:
+        return await snapshot_report("jam_sessions")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch jam session analytics: {str(e)}")
+
+@app.get("/api/analytics/playlists")
+async def get_playlist_analytics():
+    """Playlist size distribution and totals"""
+    try:
+        return await snapshot_report("playlists")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch playlist analytics: {str(e)}")
+
+@app.get("/api/analytics/deployments")
+async def get_deployment_analytics(weeks: int = Query(26, ge=1, le=520)):
+    """Weekly deployment counts: planned (plan generated), failed, in progress and plan_success_rate"""
+    try:
+        return await weekly_outcomes("deployments", weeks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch deployment analytics: {str(e)}")
+
+@app.get("/api/analytics/projects")
+async def get_project_analytics(weeks: int = Query(26, ge=1, le=520)):
+    """Weekly project deployment counts and success rates"""
+    try:
+        return await weekly_outcomes("projects", weeks)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch project analytics: {str(e)}")
+
+@app.post("/api/analytics/refresh")
+async def refresh_analytics_now(force: bool = False):
+    """Refresh analytics rollups now instead of waiting for the schedule"""
+    try:
+        return {"refreshed": await refresh_analytics(force)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analytics refresh failed: {str(e)}")
+
+# Offline geocoding
+# Jam session locations are free text; coordinates come from a local gazetteer CSV
+# (columns name, latitude, longitude) matched against the location and its
+# comma-separated parts, most specific first. No network lookups are made.
+GEOCODE_BATCH_SIZE = 500
+
+def load_gazetteer(path: str) -> Dict[str, List[float]]:
+    gazetteer = {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            try:
+                point = [float(row["longitude"]), float(row["latitude"])]
+            except (KeyError, TypeError, ValueError):
+                continue
+            gazetteer.setdefault(row["name"].strip().lower(), point)
+    return gazetteer
+
+def geocode_location(location: str, gazetteer: Dict[str, List[float]]) -> Optional[List[float]]:
+    parts = [part.strip().lower() for part in location.split(",") if part.strip()]
+    candidates = [", ".join(parts[i:]) for i in range(len(parts))] + parts
+    for candidate in candidates:
+        if candidate in gazetteer:
+            return gazetteer[candidate]
+    return None
+
+async def geocode_jam_sessions(gazetteer: Dict[str, List[float]], overwrite: bool = False) -> Dict[str, int]:
+    """Fill jam_sessions.geo from the gazetteer with batched unordered bulk writes"""
+    query = {} if overwrite else {"geo": None}
+    stats = {"scanned": 0, "geocoded": 0, "unmatched": 0}
+    operations = []
+
+    async def flush():
+        if operations:
+            await db.jam_sessions.bulk_write(operations, ordered=False)
+            stats["geocoded"] += len(operations)
+            operations.clear()
+
+    cursor = db.jam_sessions.find(query, {"_id": 1, "location": 1}).batch_size(GEOCODE_BATCH_SIZE)
+    async for doc in cursor:
+        stats["scanned"] += 1
+        coordinates = geocode_location(doc.get("location") or "", gazetteer)
+        if coordinates is None:
+            stats["unmatched"] += 1
+            continue
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"geo": {"type": "Point", "coordinates": coordinates}}}))
+        if len(operations) >= GEOCODE_BATCH_SIZE:
+            await flush()
+    await flush()
+    if stats["geocoded"]:
+        await record_change("jam_sessions", "bulk_update", None, {"count": stats["geocoded"]})
+    return stats
+
+# Online migrations
+# Versioned backfills that rewrite existing documents while the API keeps serving.
+# The runner walks a collection in _id order, one bounded batch at a time, and for
+# each document asks the migration for an update. Updates are applied with an
+# unordered bulk_write whose filter repeats the migration's guard, so a document a
+# handler rewrote in the meantime is left alone. Progress is checkpointed in the
+# ``migrations`` collection under a lease, so an interrupted run resumes where it
+# stopped and two runners never work the same migration. Throughput is capped at
+# MIGRATION_RATE_LIMIT documents per second. Readers handle both shapes meanwhile.
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "200"))
+MIGRATION_RATE_LIMIT = float(os.getenv("MIGRATION_RATE_LIMIT", "500"))
+MIGRATION_LEASE_SECONDS = 120
+
+class Migration:
+    def __init__(self, version: int, name: str, collection: str, guard: Dict[str, Any], transform, description: str):
+        self.version = version
+        self.name = name
+        self.collection = collection
+        self.guard = guard  # matches documents still in the old shape
+        self.transform = transform  # async (doc) -> update document or None
+        self.description = description
+
+async def migrate_jam_session_window(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if doc.get("starts_at") is not None:
+        return None
+    try:
+        starts_at, ends_at = session_window(doc.get("date") or "", doc.get("start_time") or "", doc.get("end_time"))
+    except ValueError:
+        return None  # unparseable legacy values stay as they are
+    return {"$set": {"starts_at": starts_at, "ends_at": ends_at}}
+
+async def migrate_inline_ai_suggestion(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    text = doc.get("ai_suggestion")
+    if text is None:
+        return None
+    await store_generated_text("ai_suggestion", doc["id"], text)
+    return {"$set": {"ai_suggestion_preview": text[:PREVIEW_CHARS]}, "$unset": {"ai_suggestion": ""}}
+
+async def migrate_uncompressed_text(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if doc.get("encoding") == "gzip" or doc.get("text") is None:
+        return None
+    raw = doc["text"].encode("utf-8")
+    return {
+        "$set": {
+            "encoding": "gzip",
+            "data": gzip.compress(raw, compresslevel=GENERATED_TEXT_COMPRESS_LEVEL, mtime=0),
+            "size": len(raw)
+        },
+        "$unset": {"text": ""}
+    }
+
+MIGRATIONS = [
+    Migration(1, "jam_sessions_session_window", "jam_sessions", {"starts_at": None},
+              migrate_jam_session_window, "Derive starts_at/ends_at from the date and time strings"),
+    Migration(2, "enhancements_split_ai_suggestion", "musicjam_enhancements", {"ai_suggestion": {"$exists": True}},
+              migrate_inline_ai_suggestion, "Move inline AI suggestions into generated_texts"),
+    Migration(3, "generated_texts_gzip", "generated_texts", {"text": {"$exists": True}},
+              migrate_uncompressed_text, "Compress plain-text generated_texts documents"),
+]
+
+def find_migration(name: str) -> Migration:
+    for migration in MIGRATIONS:
+        if migration.name == name:
+            return migration
+    raise KeyError(f"Unknown migration '{name}'")
+
+async def claim_migration(migration: Migration, owner: str) -> Optional[Dict[str, Any]]:
+    """Take (or resume) the migration's checkpoint lease; None if completed or held elsewhere"""
+    now = datetime.now(timezone.utc)
+    try:
+        return await db.migrations.find_one_and_update(
+            {
+                "_id": migration.name,
+                "status": {"$ne": "completed"},
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}, {"owner": owner}]
+            },
+            {
+                "$set": {
+                    "status": "running",
+                    "owner": owner,
+                    "lease_expires_at": now + timedelta(seconds=MIGRATION_LEASE_SECONDS),
+                    "updated_at": now
+                },
+                "$setOnInsert": {
+                    "version": migration.version,
+                    "collection": migration.collection,
+                    "last_id": None,
+                    "scanned": 0,
+                    "migrated": 0,
+                    "started_at": now
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        return None
+
+async def run_migration(migration: Migration, batch_size: int = MIGRATION_BATCH_SIZE,
+                        rate_limit: float = MIGRATION_RATE_LIMIT) -> Dict[str, Any]:
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    checkpoint = await claim_migration(migration, owner)
+    if checkpoint is None:
+        state = await db.migrations.find_one({"_id": migration.name}) or {}
+        return {"name": migration.name, "status": state.get("status", "locked"), "owner": state.get("owner")}
+
+    collection = db[migration.collection]
+    last_id = checkpoint.get("last_id")
+    scanned, migrated = checkpoint.get("scanned", 0), checkpoint.get("migrated", 0)
+    logger.info("Migration %s resuming after %s", migration.name, last_id)
+    while True:
+        started = time.monotonic()
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        batch = await collection.find(query).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        operations = []
+        for doc in batch:
+            update = await migration.transform(doc)
+            if update:
+                operations.append(UpdateOne({"_id": doc["_id"], **migration.guard}, update))
+        modified = 0
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            modified = result.modified_count
+            await record_change(migration.collection, "bulk_update", None, {"migration": migration.name, "count": modified})
+        last_id = batch[-1]["_id"]
+        scanned += len(batch)
+        migrated += modified
+        now = datetime.now(timezone.utc)
+        held = await db.migrations.update_one(
+            {"_id": migration.name, "owner": owner},
+            {"$set": {
+                "last_id": last_id,
+                "scanned": scanned,
+                "migrated": migrated,
+                "lease_expires_at": now + timedelta(seconds=MIGRATION_LEASE_SECONDS),
+                "updated_at": now
+            }}
+        )
+        if not held.matched_count:
+            raise RuntimeError(f"Lost the lease on migration {migration.name}")
+        await asyncio.sleep(max(len(batch) / rate_limit - (time.monotonic() - started), 0))
+
+    now = datetime.now(timezone.utc)
+    await db.migrations.update_one(
+        {"_id": migration.name, "owner": owner},
+        {"$set": {"status": "completed", "lease_expires_at": None, "finished_at": now, "updated_at": now}}
+    )
+    return {"name": migration.name, "status": "completed", "scanned": scanned, "migrated": migrated}
+
+async def migration_status() -> List[Dict[str, Any]]:
+    states = {doc["_id"]: doc async for doc in db.migrations.find({}, {"last_id": 0, "owner": 0})}
+    return [
+        {
+            "version": migration.version,
+            "name": migration.name,
+            "collection": migration.collection,
+            "description": migration.description,
+            **{k: v for k, v in states.get(migration.name, {"status": "pending"}).items() if k != "_id"}
+        }
+        for migration in MIGRATIONS
+    ]
+
+@app.get("/api/admin/migrations")
+async def get_migrations():
+    """List registered migrations with their checkpointed progress"""
+    try:
+        return {"migrations": await migration_status()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch migrations: {str(e)}")
+
+# Command line
+cli = typer.Typer(help="YazWho Empire Dashboard backend")
+
+@cli.callback(invoke_without_command=True)
+def main(ctx: typer.Context):
+    """Run the API server when no command is given"""
+    if ctx.invoked_subcommand is None:
+        serve()
+
+@cli.command()
+def serve(host: str = "0.0.0.0", port: int = 8001):
+    """Run the API server"""
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(app, host=host, port=port)
+
+@cli.command()
+def worker(concurrency: int = typer.Option(JOB_WORKERS, help="Number of worker coroutines")):
+    """Run job queue workers without the API (start several processes to scale out)"""
+    pool = JobWorkerPool(max(concurrency, 1), JOB_POLL_INTERVAL_SECONDS)
+    asyncio.run(pool.run_forever())
+
+@cli.command("index-advisor")
+def index_advisor(create: bool = typer.Option(False, help="Create registered indexes first")):
+    """Report queries running without index support"""
+    async def run():
+        if create:
+            await ensure_indexes()
+        return await advise_indexes()
+
+    typer.echo(json.dumps(asyncio.run(run()), indent=2, default=str))
+
+@cli.command("bench-serialization")
+def bench_serialization(
+    sizes: List[int] = typer.Option([100, 1000, 10000], "--size", help="Documents per page"),
+    repeat: int = typer.Option(20, help="Renders per measurement"),
+):
+    """Compare list page serialization paths on synthetic jam session documents"""
+    from fastapi.encoders import jsonable_encoder
+
+    paths = {
+        # Dict return without a response_model: jsonable_encoder, then stdlib json
+        "encoder+json": lambda page: JSONResponse(jsonable_encoder(page)).body,
+        # response_model validation, then re-encoding the validated model
+        "model+json": lambda page: JSONResponse(
+            jsonable_encoder(JamSessionPage.model_validate(page))
+        ).body,
+        "orjson direct": lambda page: FastJSONResponse(page).body,
+    }
+    typer.echo(f"{'docs':>6}  " + "  ".join(f"{name:>14}" for name in paths))
+    for size in sizes:
+        docs = [
+            JamSession(
+                title=f"Jam {n}",
+                description="Open jam, bring your own instrument " * 3,
+                location="Community Hall",
+                max_participants=12,
+                date=(datetime(2024, 1, 1) + timedelta(days=n % 365)).date().isoformat(),
+                start_time="19:00",
+                skill_level="All Levels",
+                genres=["Rock", "Blues"],
+            ).model_dump()
+            for n in range(size)
+        ]
+        page = {"jam_sessions": docs, "next_cursor": None}
+        timings = []
+        for render in paths.values():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                render(page)
+            timings.append((time.perf_counter() - started) / repeat * 1000)
+        typer.echo(f"{size:>6}  " + "  ".join(f"{ms:>12.2f}ms" for ms in timings))
+
+@cli.command("geocode-jam-sessions")
+def geocode_jam_sessions_command(
+    gazetteer: str = typer.Option(..., help="CSV with name, latitude and longitude columns"),
+    overwrite: bool = typer.Option(False, help="Re-geocode sessions that already have coordinates"),
+):
+    """Fill jam session coordinates from a local gazetteer"""
+    places = load_gazetteer(gazetteer)
+    typer.echo(f"Loaded {len(places)} gazetteer entries")
+    typer.echo(json.dumps(asyncio.run(geocode_jam_sessions(places, overwrite)), indent=2))
+
+@cli.command()
+def migrate(
+    name: Optional[str] = typer.Argument(None, help="Migration to run; all pending ones in version order by default"),
+    batch_size: int = typer.Option(MIGRATION_BATCH_SIZE, help="Documents per batch"),
+    rate: float = typer.Option(MIGRATION_RATE_LIMIT, help="Maximum documents scanned per second"),
+    status: bool = typer.Option(False, "--status", help="Only show migration progress"),
+):
+    """Run online data migrations, resuming from their checkpoints"""
+    async def run():
+        if status:
+            return await migration_status()
+        try:
+            migrations = [find_migration(name)] if name else sorted(MIGRATIONS, key=lambda m: m.version)
+        except KeyError as e:
+            raise typer.BadParameter(str(e.args[0]))
+        return [await run_migration(migration, max(batch_size, 1), max(rate, 1)) for migration in migrations]
+
+    typer.echo(json.dumps(asyncio.run(run()), indent=2, default=str))
+
+@cli.command("export-parquet")
+def export_parquet(
+    datasets: List[str] = typer.Option(
+        ["jam-sessions", "projects", "deployments", "enhancements"], "--dataset", help="Datasets to export"
+    ),
+    out_dir: str = typer.Option(PARQUET_EXPORT_DIR, help="Directory for the partitioned Parquet datasets"),
+    chunk_size: int = typer.Option(PARQUET_CHUNK_SIZE, help="Documents per chunk"),
+):
+    """Export collections as created_month-partitioned Parquet datasets"""
+    unknown = [dataset for dataset in datasets if dataset not in EXPORT_DATASETS]
+    if unknown:
+        raise typer.BadParameter(f"Unknown datasets {unknown}, expected one of: {', '.join(EXPORT_DATASETS)}")
+
+    async def run():
+        return [
+            await export_parquet_dataset(EXPORT_DATASETS[dataset], out_dir, chunk_size=max(chunk_size, 1))
+            for dataset in datasets
+        ]
+
+    typer.echo(json.dumps(asyncio.run(run()), indent=2))
+
+if __name__ == "__main__":
+    cli()
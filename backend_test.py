@@ -8,7 +8,7 @@ import requests
 import json
 import time
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List
 
 class YazWhoEmpireAPITester:
@@ -32,6 +32,7 @@ class YazWhoEmpireAPITester:
         self.created_playlist_id = None
         self.created_enhancement_id = None
         self.created_project_id = None
+        self.created_deployment_id = None
 
     def log_test(self, name: str, success: bool, response_time: float, details: str = ""):
         """Log test result"""
@@ -84,6 +85,17 @@ class YazWhoEmpireAPITester:
             response_time = time.time() - start_time
             return 0, {"error": str(e)}, response_time
 
+    def make_raw_request(self, endpoint: str, params: Dict = None, headers: Dict = None, stream: bool = False) -> tuple:
+        """GET a non-JSON endpoint and return the raw response with its response time"""
+        url = f"{self.base_url}{endpoint}"
+        start_time = time.time()
+        try:
+            response = self.session.get(url, params=params, headers=headers, stream=stream, timeout=15)
+        except Exception as e:
+            print(f"   Request to {endpoint} failed: {str(e)}")
+            response = None
+        return response, time.time() - start_time
+
     # ==================== CORE API TESTS ====================
     
     def test_root_endpoint(self):
@@ -108,6 +120,51 @@ class YazWhoEmpireAPITester:
         self.log_test("Empire Overview", success, rt, details)
         return success
 
+    def test_coalescing_stats(self):
+        """Test request coalescing counters"""
+        status, data, rt = self.make_request('GET', '/api/coalescing/stats')
+        success = status == 200 and 'namespaces' in data
+        details = f"In flight: {data.get('in_flight', 0)}"
+        self.log_test("Coalescing Stats", success, rt, details)
+        return success
+
+    def test_metrics(self):
+        """Test Prometheus metrics exposition"""
+        status, data, rt = self.make_request('GET', '/api/metrics')
+        text = data.get('raw_response', '')
+        success = status == 200 and 'http_request_duration_seconds_bucket' in text
+        self.log_test("Prometheus Metrics", success, rt, f"Status: {status}")
+        return success
+
+    def test_change_stream(self):
+        """Test the change feed sends its ready event"""
+        response, rt = self.make_raw_request('/api/changes/stream', params={"collections": "projects,deployments"}, stream=True)
+        success = False
+        if response is not None:
+            try:
+                lines = response.iter_lines(decode_unicode=True)
+                first = next((line for line in lines if line), "")
+                success = (response.status_code == 200
+                           and response.headers.get('Content-Type', '').startswith('text/event-stream')
+                           and first == 'event: ready')
+            finally:
+                response.close()
+        status = response.status_code if response is not None else 0
+        self.log_test("Change Stream", success, rt, f"Status: {status}")
+        return success
+
+    def test_migrations(self):
+        """Test migration registry and checkpoint progress"""
+        status, data, rt = self.make_request('GET', '/api/admin/migrations')
+        migrations = data.get('migrations', []) if status == 200 else []
+        versions = [m.get('version') for m in migrations]
+        success = (status == 200 and len(migrations) > 0 and versions == sorted(versions)
+                   and all(m.get('name') and m.get('status') in ('pending', 'running', 'completed') for m in migrations)
+                   and all('last_id' not in m and 'owner' not in m for m in migrations))
+        details = ", ".join(f"{m.get('name')}: {m.get('status')}" for m in migrations)
+        self.log_test("Migrations", success, rt, details or f"Status: {status}")
+        return success
+
     # ==================== GITHUB INTEGRATION TESTS ====================
     
     def test_github_repositories(self):
@@ -160,6 +217,14 @@ class YazWhoEmpireAPITester:
         self.log_test("AI Music Recommendations", success, rt, f"Status: {status}")
         return success
 
+    def test_ai_cache_stats(self):
+        """Test AI response cache hit/miss counters"""
+        status, data, rt = self.make_request('GET', '/api/ai/cache/stats')
+        success = status == 200 and 'routes' in data
+        details = f"Routes cached: {len(data.get('routes', {}))}"
+        self.log_test("AI Cache Stats", success, rt, details)
+        return success
+
     # ==================== PROJECT MANAGEMENT TESTS ====================
     
     def test_get_projects(self):
@@ -220,6 +285,23 @@ class YazWhoEmpireAPITester:
         self.log_test("Create Jam Session", success, rt, f"Status: {status}")
         return success
 
+    def test_bulk_create_jam_sessions(self):
+        """Test bulk jam session import with one invalid item"""
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        jam_data = {
+            "title": "Test Bulk Jam Session",
+            "description": "Testing bulk jam session import via API",
+            "location": "Test Studio, Test City",
+            "date": tomorrow,
+            "start_time": "19:00",
+            "skill_level": "All Levels",
+            "genres": ["Jazz"]
+        }
+        status, data, rt = self.make_request('POST', '/api/musicjam/jam-sessions/bulk', [jam_data, jam_data, {"title": "Missing fields"}])
+        success = status == 200 and data.get('created') == 2 and data.get('failed') == 1
+        self.log_test("Bulk Create Jam Sessions", success, rt, f"Status: {status}")
+        return success
+
     def test_get_jam_session_by_id(self):
         """Test get specific jam session"""
         if not self.created_jam_session_id:
@@ -283,6 +365,8 @@ class YazWhoEmpireAPITester:
         }
         status, data, rt = self.make_request('POST', '/api/deploy/enhancement', deploy_data)
         success = status in [200, 404]  # 404 if enhancement not found is acceptable
+        if status == 200:
+            self.created_deployment_id = data.get('deployment_id')
         self.log_test("Deploy Enhancement", success, rt, f"Status: {status}")
         return success
 
@@ -294,6 +378,42 @@ class YazWhoEmpireAPITester:
         self.log_test("Get Deployment Status", success, rt, details)
         return success
 
+    def check_text_encoding(self, name: str, endpoint: str) -> bool:
+        """Fetch a generated text as gzip and as identity and check both decode to the same markdown"""
+        gzipped, rt = self.make_raw_request(endpoint, headers={'Accept-Encoding': 'gzip'})
+        plain, rt2 = self.make_raw_request(endpoint, headers={'Accept-Encoding': 'identity'})
+        rt += rt2
+        success = (gzipped is not None and plain is not None
+                   and gzipped.status_code == 200 and plain.status_code == 200
+                   and gzipped.headers.get('Content-Type', '').startswith('text/markdown')
+                   and 'Content-Encoding' not in plain.headers
+                   and 'Accept-Encoding' in gzipped.headers.get('Vary', '')
+                   and gzipped.text == plain.text)
+        details = f"Encoding: {gzipped.headers.get('Content-Encoding', 'identity') if gzipped is not None else 'n/a'}"
+        self.log_test(name, success, rt, details)
+        return success
+
+    def first_id(self, endpoint: str, key: str):
+        status, data, _ = self.make_request('GET', endpoint, params={"limit": 1})
+        items = data.get(key, []) if status == 200 else []
+        return items[0].get('id') if items else None
+
+    def test_enhancement_suggestion_text(self):
+        """Test full AI suggestion text with gzip and identity encodings"""
+        enhancement_id = self.created_enhancement_id or self.first_id('/api/musicjam/enhancements', 'enhancements')
+        if not enhancement_id:
+            self.log_test("Enhancement Suggestion Text", False, 0, "No enhancement ID available")
+            return False
+        return self.check_text_encoding("Enhancement Suggestion Text", f'/api/musicjam/enhancements/{enhancement_id}/ai-suggestion')
+
+    def test_deployment_plan_text(self):
+        """Test full deployment plan text with gzip and identity encodings"""
+        deployment_id = self.created_deployment_id or self.first_id('/api/deploy/status', 'deployments')
+        if not deployment_id:
+            self.log_test("Deployment Plan Text", False, 0, "No deployment ID available")
+            return False
+        return self.check_text_encoding("Deployment Plan Text", f'/api/deploy/status/{deployment_id}/plan')
+
     def test_generate_component(self):
         """Test React component generation"""
         component_data = {
@@ -338,6 +458,150 @@ class YazWhoEmpireAPITester:
         
         return all_passed
 
+    def test_jam_sessions_pagination(self):
+        """Test keyset pagination across jam session pages"""
+        params = {"sort_by": "date", "limit": 1}
+        status, data, rt = self.make_request('GET', '/api/musicjam/jam-sessions', params=params)
+        success = status == 200 and 'next_cursor' in data and len(data.get('jam_sessions', [])) <= 1
+        if success and data.get('next_cursor'):
+            first_ids = [s.get('id') for s in data.get('jam_sessions', [])]
+            params["cursor"] = data['next_cursor']
+            status, data, rt2 = self.make_request('GET', '/api/musicjam/jam-sessions', params=params)
+            rt += rt2
+            success = status == 200 and all(s.get('id') not in first_ids for s in data.get('jam_sessions', []))
+        self.log_test("Jam Sessions Pagination", success, rt, f"Status: {status}")
+        return success
+
+    def test_jam_sessions_time_window(self):
+        """Test from/to filtering on session start times"""
+        day = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+        jam_data = {
+            "title": "Test Windowed Jam Session",
+            "description": "Testing from/to filtering via API",
+            "location": "Test Studio, Test City",
+            "date": day,
+            "start_time": "19:00",
+            "end_time": "21:00",
+            "skill_level": "All Levels",
+            "genres": ["Funk"]
+        }
+        status, created, rt = self.make_request('POST', '/api/musicjam/jam-sessions', jam_data)
+        # Naive UTC bounds, compared against the UTC starts_at the API returns
+        window_from = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) + timedelta(days=2)
+        window_to = window_from + timedelta(days=3)
+        params = {"from": f"{window_from.isoformat()}Z", "to": f"{window_to.isoformat()}Z", "limit": 500}
+        status, data, rt2 = self.make_request('GET', '/api/musicjam/jam-sessions', params=params)
+        rt += rt2
+        sessions = data.get('jam_sessions', []) if status == 200 else []
+        starts = [datetime.fromisoformat(s['starts_at']).astimezone(timezone.utc).replace(tzinfo=None)
+                  for s in sessions if s.get('starts_at')]
+        success = (status == 200 and created.get('id') in [s.get('id') for s in sessions]
+                   and len(starts) == len(sessions)
+                   and all(window_from <= start < window_to for start in starts))
+
+        params = {"to": f"{window_from.isoformat()}Z", "limit": 500}
+        status, data, rt2 = self.make_request('GET', '/api/musicjam/jam-sessions', params=params)
+        rt += rt2
+        success = success and status == 200 and created.get('id') not in [s.get('id') for s in data.get('jam_sessions', [])]
+        self.log_test("Jam Sessions Time Window", success, rt, f"Status: {status}, In window: {len(starts)}")
+        return success
+
+    def test_jam_session_status_sweep(self, timeout: float = 90):
+        """Test the scheduled sweeper completes a session that has already ended"""
+        jam_data = {
+            "title": "Test Finished Jam Session",
+            "description": "Testing the jam session status sweeper via API",
+            "location": "Test Studio, Test City",
+            "date": (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
+            "start_time": "10:00",
+            "end_time": "12:00",
+            "skill_level": "All Levels",
+            "genres": ["Blues"]
+        }
+        status, created, rt = self.make_request('POST', '/api/musicjam/jam-sessions', jam_data)
+        session_status = None
+        started = time.time()
+        deadline = started + timeout
+        while status == 200 and time.time() < deadline:
+            status, data, _ = self.make_request('GET', f"/api/musicjam/jam-sessions/{created.get('id')}")
+            session_status = data.get('status')
+            if session_status == 'completed':
+                break
+            time.sleep(2)
+        success = session_status == 'completed'
+        self.log_test("Jam Session Status Sweep", success, rt + time.time() - started, f"Status: {session_status}")
+        return success
+
+    def test_musicjam_search(self):
+        """Test relevance-ranked search across jam sessions and playlists"""
+        status, data, rt = self.make_request('GET', '/api/musicjam/search', params={"q": "jam", "limit": 5})
+        scores = [r.get('score', 0) for r in data.get('results', [])] if status == 200 else []
+        success = status == 200 and 'next_offset' in data and scores == sorted(scores, reverse=True)
+        self.log_test("MusicJam Search", success, rt, f"Status: {status}, Results: {len(scores)}")
+        return success
+
+    def test_nearby_jam_sessions(self):
+        """Test geospatial jam session lookup, nearest first within the radius"""
+        jam_data = {
+            "title": "Test Geocoded Jam Session",
+            "description": "Testing nearby jam session lookup via API",
+            "location": "Test Studio, London",
+            "geo": {"type": "Point", "coordinates": [-0.1, 51.5]},
+            "date": (datetime.now() + timedelta(days=2)).strftime("%Y-%m-%d"),
+            "start_time": "19:00",
+            "skill_level": "All Levels",
+            "genres": ["Folk"]
+        }
+        status, created, rt = self.make_request('POST', '/api/musicjam/jam-sessions', jam_data)
+        params = {"lat": 51.5074, "lng": -0.1278, "radius_km": 50, "limit": 500}
+        status, data, rt2 = self.make_request('GET', '/api/musicjam/jam-sessions/nearby', params=params)
+        rt += rt2
+        sessions = data.get('jam_sessions', []) if status == 200 else []
+        distances = [s.get('distance_m', 0) for s in sessions]
+        success = (status == 200 and distances == sorted(distances)
+                   and all(d <= params["radius_km"] * 1000 for d in distances)
+                   and created.get('id') in [s.get('id') for s in sessions])
+        self.log_test("Nearby Jam Sessions", success, rt, f"Status: {status}, Results: {len(distances)}")
+
+        status, data, rt = self.make_request('GET', '/api/musicjam/jam-sessions/nearby', params={"lat": 95, "lng": 0})
+        self.log_test("Nearby Jam Sessions Invalid Point", status == 422, rt, f"Status: {status}")
+        return success and status == 422
+
+    # ==================== EXPORT TESTS ====================
+
+    def test_export_ndjson(self):
+        """Test streaming a collection export as NDJSON"""
+        response, rt = self.make_raw_request('/api/export/jam-sessions', params={"status": "upcoming"})
+        success = False
+        rows = 0
+        if response is not None and response.status_code == 200:
+            try:
+                records = [json.loads(line) for line in response.text.splitlines() if line]
+                rows = len(records)
+                success = (response.headers.get('Content-Type', '').startswith('application/x-ndjson')
+                           and 'attachment' in response.headers.get('Content-Disposition', '')
+                           and all(r.get('status') == 'upcoming' and '_id' not in r for r in records))
+            except ValueError:
+                success = False
+        status = response.status_code if response is not None else 0
+        self.log_test("Export NDJSON", success, rt, f"Status: {status}, Rows: {rows}")
+
+        status, data, rt = self.make_request('GET', '/api/export/unknown-dataset')
+        self.log_test("Export Unknown Dataset", status == 404, rt, f"Status: {status}")
+        return success and status == 404
+
+    def test_export_parquet(self):
+        """Test streaming a collection export as a Parquet file"""
+        response, rt = self.make_raw_request('/api/export/jam-sessions/parquet')
+        status = response.status_code if response is not None else 0
+        body = response.content if status == 200 else b""
+        # A complete Parquet file starts and ends with the PAR1 magic bytes
+        success = (status == 200
+                   and response.headers.get('Content-Type', '').startswith('application/vnd.apache.parquet')
+                   and body[:4] == b"PAR1" and body[-4:] == b"PAR1")
+        self.log_test("Export Parquet", success, rt, f"Status: {status}, Bytes: {len(body)}")
+        return success
+
     # ==================== ERROR HANDLING TESTS ====================
     
     def test_invalid_endpoints(self):
@@ -397,6 +661,10 @@ class YazWhoEmpireAPITester:
         self.test_root_endpoint()
         self.test_status_endpoint()
         self.test_empire_overview()
+        self.test_coalescing_stats()
+        self.test_metrics()
+        self.test_change_stream()
+        self.test_migrations()
         
         # GitHub Integration Tests
         print("\n🐙 GITHUB INTEGRATION TESTS")
@@ -409,6 +677,7 @@ class YazWhoEmpireAPITester:
         print("-" * 30)
         self.test_ai_musicjam_enhance()
         self.test_ai_music_recommendations()
+        self.test_ai_cache_stats()
         
         # Project Management Tests
         print("\n📊 PROJECT MANAGEMENT TESTS")
@@ -422,6 +691,7 @@ class YazWhoEmpireAPITester:
         print("-" * 30)
         self.test_get_jam_sessions()
         self.test_create_jam_session()
+        self.test_bulk_create_jam_sessions()
         self.test_get_jam_session_by_id()
         self.test_get_playlists()
         self.test_create_playlist()
@@ -432,6 +702,8 @@ class YazWhoEmpireAPITester:
         print("-" * 30)
         self.test_deploy_enhancement()
         self.test_get_deployment_status()
+        self.test_enhancement_suggestion_text()
+        self.test_deployment_plan_text()
         self.test_generate_component()
         self.test_simulate_musicjam_deployment()
         
@@ -439,6 +711,17 @@ class YazWhoEmpireAPITester:
         print("\n🔍 FILTERING & SORTING TESTS")
         print("-" * 30)
         self.test_jam_sessions_filtering()
+        self.test_jam_sessions_pagination()
+        self.test_jam_sessions_time_window()
+        self.test_jam_session_status_sweep()
+        self.test_musicjam_search()
+        self.test_nearby_jam_sessions()
+        
+        # Export Tests
+        print("\n📦 EXPORT TESTS")
+        print("-" * 30)
+        self.test_export_ndjson()
+        self.test_export_parquet()
         
         # Error Handling Tests
         print("\n⚠️ ERROR HANDLING TESTS")
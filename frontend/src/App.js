@@ -976,7 +976,14 @@ function DeploymentCenter({ enhancements, fetchEnhancements }) {
         })
       });
       const result = await response.json();
-      setDeploymentPlan(result.deployment_plan);
+      // The plan is generated in the background; poll until it leaves the planning state
+      let deployment = result;
+      for (let attempt = 0; attempt < 60 && deployment.status === 'planning'; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusResponse = await fetch(`${process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001'}/api/deploy/status/${result.deployment_id}`);
+        deployment = await statusResponse.json();
+      }
+      setDeploymentPlan(deployment.deployment_plan);
       alert('🎯 Deployment plan created successfully!');
       fetchDeployments();
     } catch (error) {
@@ -986,6 +993,17 @@ function DeploymentCenter({ enhancements, fetchEnhancements }) {
     setLoading(false);
   };
 
+  const viewEnhancement = async (enhancement) => {
+    try {
+      // Plain-text endpoint: the stored gzip bytes are sent as-is and the browser inflates them
+      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001'}/api/musicjam/enhancements/${enhancement.id}/ai-suggestion`);
+      const aiSuggestion = await response.text();
+      setSelectedEnhancement({ ...enhancement, ai_suggestion: aiSuggestion });
+    } catch (error) {
+      console.error('Failed to fetch enhancement details:', error);
+    }
+  };
+
   const generateComponent = async (enhancement) => {
     setLoading(true);
     try {
@@ -995,7 +1013,7 @@ function DeploymentCenter({ enhancements, fetchEnhancements }) {
         body: JSON.stringify({
           component_name: `${enhancement.feature_name.replace('-', '')}Component`,
           feature_type: enhancement.enhancement_type,
-          description: enhancement.ai_suggestion.substring(0, 500)
+          description: (enhancement.ai_suggestion_preview || '').substring(0, 500)
         })
       });
       const result = await response.json();
@@ -1100,7 +1118,7 @@ function DeploymentCenter({ enhancements, fetchEnhancements }) {
                   </button>
                   
                   <button
-                    onClick={() => setSelectedEnhancement(enhancement)}
+                    onClick={() => viewEnhancement(enhancement)}
                     className="bg-yellow-600 hover:bg-yellow-700 text-white font-semibold py-2 px-3 rounded text-sm transition-colors"
                   >
                     👁️ View Details
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """Point the server module at an in-memory Mongo (skipped when mongomock-motor is absent)"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import server
+
+    from mongomock.collection import BulkOperationBuilder
+
+    # mongomock predates the sort keyword newer pymongo passes from UpdateOne
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        BulkOperationBuilder, "add_update", lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+    )
+    db = mongomock_motor.AsyncMongoMockClient().yazwho_empire
+    monkeypatch.setattr(server, "db", db)
+    return db
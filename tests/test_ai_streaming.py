@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class FakeCache:
+    def make_key(self, *parts):
+        return "key"
+
+    async def get(self, route, key):
+        return None
+
+    async def set(self, route, key, value):
+        pass
+
+
+def test_disconnect_closes_the_upstream_stream_immediately(monkeypatch):
+    closed = []
+
+    class FakeExecutor:
+        model_name = "fake"
+
+        async def stream(self, prompt):
+            try:
+                for text in ["one", "two", "three"]:
+                    yield text
+            finally:
+                closed.append(True)
+
+    monkeypatch.setattr(server, "ai_executor", FakeExecutor())
+    monkeypatch.setattr(server, "ai_cache", FakeCache())
+
+    async def on_complete(text):
+        return {}
+
+    async def run():
+        request = FakeRequest()
+        events = server.stream_cached(request, "route", "{x}", {"x": 1}, on_complete)
+        assert "one" in await events.__anext__()
+        request.disconnected = True
+        remaining = [event async for event in events]
+        # Closed before the generator returned, not left for garbage collection
+        return remaining, list(closed)
+
+    remaining, closed_at_return = asyncio.run(run())
+    assert remaining == []
+    assert closed_at_return == [True]
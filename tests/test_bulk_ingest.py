@@ -0,0 +1,32 @@
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+def test_oversized_json_array_is_refused_before_parsing(monkeypatch):
+    monkeypatch.setattr(server, "BULK_MAX_JSON_BYTES", 64)
+
+    def loads(_):
+        raise AssertionError("body should not be parsed")
+
+    monkeypatch.setattr(server.orjson, "loads", loads)
+    body = b"[" + b",".join(b'{"title": "jam"}' for _ in range(10)) + b"]"
+
+    client = TestClient(server.app)
+    response = client.post(
+        "/api/musicjam/jam-sessions/bulk", content=body, headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 413
+
+    # Without a Content-Length the cap is enforced while the body streams in
+    response = client.post(
+        "/api/musicjam/jam-sessions/bulk",
+        content=iter([body[:40], body[40:]]),
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+class FakeVersions:
+    def __init__(self, versions):
+        self.versions = versions
+        self.fail = False
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        if self.fail:
+            raise RuntimeError("mongo blip")
+        name = query["_id"]
+        self.versions[name] = self.versions.get(name, 0) + 1
+        return {"_id": name, "version": self.versions[name]}
+
+    async def find(self, query):
+        for name, version in list(self.versions.items()):
+            yield {"_id": name, "version": version}
+
+
+def test_failed_bump_is_not_undone_by_refresh(monkeypatch):
+    store = FakeVersions({"projects": 3})
+    monkeypatch.setattr(server, "db", SimpleNamespace(collection_versions=store))
+    monkeypatch.setattr(server, "collection_versions", {})
+    monkeypatch.setattr(server, "unversioned_collections", set())
+
+    async def run():
+        await server.refresh_collection_versions()
+        assert server.collection_versions["projects"] == 3
+
+        store.fail = True
+        await server.bump_collection_version("projects")
+        await server.refresh_collection_versions()
+        # The DB still holds the pre-write version; it must not be served again
+        assert "projects" not in server.collection_versions
+
+        store.fail = False
+        await server.refresh_collection_versions()
+        assert server.collection_versions["projects"] == 4
+        assert not server.unversioned_collections
+
+    asyncio.run(run())
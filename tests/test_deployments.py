@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+def test_deployment_plan_generation_errors_reach_the_job_queue(monkeypatch):
+    async def generate_cached(*args, **kwargs):
+        raise server.AIGenerationTimeout("AI generation exceeded 60s deadline")
+
+    monkeypatch.setattr(server, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(server, "generate_cached", generate_cached)
+
+    enhancement = {"feature_name": "Live tabs", "enhancement_type": "ui", "ai_suggestion": "..."}
+    with pytest.raises(server.AIGenerationTimeout):
+        asyncio.run(server.create_deployment_plan(enhancement))
+
+
+@pytest.mark.parametrize("fields", [
+    "deployment_plan,deployment_plan.complexity",
+    "deployment_plan.complexity,deployment_plan",
+    "id.value",
+    "created_at.year",
+    "deployment_plan.,status",
+])
+def test_list_projection_rejects_overlapping_fields(fields):
+    with pytest.raises(server.HTTPException) as exc:
+        server.list_projection(fields, "summary", server.DEPLOYMENT_SUMMARY_FIELDS, "created_at")
+    assert exc.value.status_code == 400
+
+
+def test_list_projection_keeps_id_and_sort_field():
+    projection = server.list_projection(
+        "status,deployment_plan.complexity,id", "summary", server.DEPLOYMENT_SUMMARY_FIELDS, "created_at"
+    )
+    assert projection == {
+        "_id": 0, "id": 1, "created_at": 1, "status": 1, "deployment_plan.complexity": 1
+    }
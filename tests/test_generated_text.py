@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, GZIP;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, *", False),
+    ("gzip;q=abc", False),
+    ("identity", False),
+    ("deflate, br", False),
+    ("", False),
+    (None, False),
+])
+def test_accepts_encoding(header, expected):
+    assert server.accepts_encoding(header, "gzip") is expected
+
+
+def test_generated_text_round_trips_through_gzip():
+    text = "# Plan\n\n" + "Step with unicode ♫\n" * 200
+    doc = {"encoding": "gzip", "data": server.gzip.compress(text.encode("utf-8"))}
+    assert server.decode_generated_text(doc) == text
+    assert server.decode_generated_text({"text": "plain"}) == "plain"
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+GAZETTEER = {
+    "camden, london": [-0.1426, 51.539],
+    "london": [-0.1278, 51.5074],
+    "bristol": [-2.5879, 51.4545],
+}
+
+
+def test_geocode_prefers_the_most_specific_match():
+    assert server.geocode_location("The Roundhouse, Camden, London", GAZETTEER) == [-0.1426, 51.539]
+
+
+def test_geocode_falls_back_to_any_part():
+    assert server.geocode_location("Old Vic Tunnels, London, UK", GAZETTEER) == [-0.1278, 51.5074]
+    assert server.geocode_location("  BRISTOL  ", GAZETTEER) == [-2.5879, 51.4545]
+
+
+def test_geocode_returns_none_when_nothing_matches():
+    assert server.geocode_location("Somewhere, Atlantis", GAZETTEER) is None
+    assert server.geocode_location("", GAZETTEER) is None
+
+
+def test_load_gazetteer_skips_bad_rows(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(
+        "name,latitude,longitude\n"
+        "London,51.5074,-0.1278\n"
+        "Nowhere,not-a-number,0\n"
+        "london,0,0\n",
+        encoding="utf-8",
+    )
+    # Coordinates are stored GeoJSON-style as [longitude, latitude]; the first entry wins
+    assert server.load_gazetteer(str(path)) == {"london": [-0.1278, 51.5074]}
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import server
+
+UTC = timezone.utc
+
+
+def test_session_window_with_explicit_end():
+    assert server.session_window("2026-03-14", "19:00", "22:30") == (
+        datetime(2026, 3, 14, 19, 0, tzinfo=UTC), datetime(2026, 3, 14, 22, 30, tzinfo=UTC)
+    )
+
+
+def test_session_window_defaults_the_length(monkeypatch):
+    monkeypatch.setattr(server, "JAM_SESSION_DEFAULT_HOURS", 3)
+    starts_at, ends_at = server.session_window("2026-03-14", "19:00:00", None)
+    assert ends_at - starts_at == timedelta(hours=3)
+
+
+def test_session_window_rolls_an_earlier_end_to_the_next_day():
+    starts_at, ends_at = server.session_window("2026-12-31", "22:00", "02:00")
+    assert ends_at == datetime(2027, 1, 1, 2, 0, tzinfo=UTC)
+    assert ends_at > starts_at
+
+
+def test_session_window_converts_local_times_to_utc(monkeypatch):
+    monkeypatch.setattr(server, "JAM_SESSION_TIMEZONE", ZoneInfo("Europe/London"))
+    starts_at, _ = server.session_window("2026-07-01", "19:00", "21:00")
+    assert starts_at == datetime(2026, 7, 1, 18, 0, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("day, start_time", [("14/03/2026", "19:00"), ("2026-03-14", "7pm"), ("", "")])
+def test_session_window_rejects_unparseable_input(day, start_time):
+    with pytest.raises(ValueError):
+        server.session_window(day, start_time, None)
+
+
+def test_jam_session_query_window_is_half_open_in_utc():
+    query = server.jam_session_query(
+        "Upcoming", "Rock", datetime(2026, 3, 1), datetime(2026, 3, 8, 1, tzinfo=timezone(timedelta(hours=1)))
+    )
+    assert query == {
+        "status": "upcoming",
+        "genres": {"$in": ["Rock"]},
+        "starts_at": {"$gte": datetime(2026, 3, 1, tzinfo=UTC), "$lt": datetime(2026, 3, 8, tzinfo=UTC)},
+    }
+
+
+def test_sweep_moves_sessions_by_their_window(mongo_db):
+    now = datetime.now(UTC)
+    sessions = [
+        {"id": "future", "status": "upcoming", "starts_at": now + timedelta(hours=1), "ends_at": now + timedelta(hours=2)},
+        {"id": "live", "status": "upcoming", "starts_at": now - timedelta(hours=1), "ends_at": now + timedelta(hours=1)},
+        {"id": "missed", "status": "upcoming", "starts_at": now - timedelta(hours=3), "ends_at": now - timedelta(hours=2)},
+        {"id": "over", "status": "ongoing", "starts_at": now - timedelta(hours=3), "ends_at": now - timedelta(hours=1)},
+    ]
+
+    async def scenario():
+        await mongo_db.jam_sessions.insert_many(sessions)
+        moved = await server.sweep_jam_session_statuses()
+        again = await server.sweep_jam_session_statuses()
+        statuses = {doc["id"]: doc["status"] async for doc in mongo_db.jam_sessions.find({})}
+        return moved, again, statuses
+
+    moved, again, statuses = asyncio.run(scenario())
+    assert moved == {"upcoming->completed": 1, "upcoming->ongoing": 1, "ongoing->completed": 1}
+    assert again == {}
+    assert statuses == {"future": "upcoming", "live": "ongoing", "missed": "completed", "over": "completed"}
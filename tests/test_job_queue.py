@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def expire_lease(db, job_id):
+    await db.jobs.update_one(
+        {"id": job_id}, {"$set": {"lease_expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+
+
+def test_claim_takes_a_queued_job_once(mongo_db):
+    async def scenario():
+        job_id = await server.enqueue_job("plan_deployment", {"deployment_id": "d1"})
+        job = await server.claim_job("w1")
+        assert job["id"] == job_id
+        assert (job["status"], job["attempts"], job["locked_by"]) == ("running", 1, "w1")
+        assert await server.claim_job("w2") is None
+
+    run(scenario())
+
+
+def test_failures_are_retried_with_exponential_backoff(mongo_db, monkeypatch):
+    monkeypatch.setattr(server, "JOB_RETRY_BASE_SECONDS", 10)
+
+    async def scenario():
+        job_id = await server.enqueue_job("noop", {})
+        delays = []
+        for _ in range(2):
+            job = await server.claim_job("w1")
+            before = datetime.now()
+            await server.finish_job(job, "w1", RuntimeError("boom"))
+            stored = await mongo_db.jobs.find_one({"id": job_id})
+            assert stored["status"] == "queued"
+            assert stored["last_error"] == "boom"
+            delays.append(round((stored["run_at"].replace(tzinfo=None) - before).total_seconds()))
+            # Not claimable until its backoff has elapsed
+            assert await server.claim_job("w1") is None
+            await mongo_db.jobs.update_one({"id": job_id}, {"$set": {"run_at": datetime.now(timezone.utc)}})
+        return delays
+
+    assert run(scenario()) == [10, 20]
+
+
+def test_final_failure_runs_the_failure_handler(mongo_db, monkeypatch):
+    failures = []
+
+    async def on_failure(payload, error):
+        failures.append((payload, str(error)))
+
+    monkeypatch.setitem(server.JOB_FAILURE_HANDLERS, "noop", on_failure)
+
+    async def scenario():
+        job_id = await server.enqueue_job("noop", {"n": 1}, max_attempts=1)
+        job = await server.claim_job("w1")
+        await server.finish_job(job, "w1", RuntimeError("boom"))
+        return (await mongo_db.jobs.find_one({"id": job_id}))["status"]
+
+    assert run(scenario()) == "failed"
+    assert failures == [({"n": 1}, "boom")]
+
+
+def test_expired_lease_is_reclaimed_and_the_old_owner_cannot_finish(mongo_db):
+    async def scenario():
+        job_id = await server.enqueue_job("noop", {})
+        first = await server.claim_job("w1")
+        assert await server.claim_job("w2") is None
+        await expire_lease(mongo_db, job_id)
+        second = await server.claim_job("w2")
+        assert (second["locked_by"], second["attempts"]) == ("w2", 2)
+
+        # The stalled worker finishing late must not overwrite the new owner's run
+        await server.finish_job(first, "w1")
+        assert (await mongo_db.jobs.find_one({"id": job_id}))["status"] == "running"
+        await server.finish_job(second, "w2")
+        assert (await mongo_db.jobs.find_one({"id": job_id}))["status"] == "succeeded"
+
+    run(scenario())
+
+
+def test_expired_lease_on_the_final_attempt_fails_the_job(mongo_db, monkeypatch):
+    failures = []
+
+    async def on_failure(payload, error):
+        failures.append(payload)
+
+    monkeypatch.setitem(server.JOB_FAILURE_HANDLERS, "noop", on_failure)
+
+    async def scenario():
+        job_id = await server.enqueue_job("noop", {"n": 1}, max_attempts=1)
+        await server.claim_job("w1")
+        await expire_lease(mongo_db, job_id)
+        assert await server.claim_job("w2") is None
+        failed = await server.fail_expired_job()
+        assert failed["id"] == job_id
+        assert await server.fail_expired_job() is None
+        return await mongo_db.jobs.find_one({"id": job_id})
+
+    job = run(scenario())
+    assert (job["status"], job["attempts"]) == ("failed", 1)
+    assert failures == [{"n": 1}]
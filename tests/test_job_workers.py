@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+def test_worker_survives_failing_finish_job(monkeypatch):
+    claims = []
+
+    async def claim_job(worker_id):
+        claims.append(worker_id)
+        if len(claims) == 1:
+            return {"id": "job-1", "type": "noop", "payload": {}, "attempts": 1, "max_attempts": 5}
+        return None
+
+    async def finish_job(job, worker_id, error=None):
+        raise RuntimeError("mongo blip")
+
+    async def noop(payload):
+        pass
+
+    async def fail_expired_job():
+        return None
+
+    monkeypatch.setattr(server, "fail_expired_job", fail_expired_job)
+    monkeypatch.setattr(server, "claim_job", claim_job)
+    monkeypatch.setattr(server, "finish_job", finish_job)
+    monkeypatch.setitem(server.JOB_HANDLERS, "noop", noop)
+
+    async def run():
+        pool = server.JobWorkerPool(1, poll_interval=0.01)
+        await pool.start()
+        await asyncio.sleep(0.1)
+        alive = not pool._tasks[0].done()
+        await pool.stop()
+        return alive
+
+    assert asyncio.run(run())
+    assert len(claims) > 1
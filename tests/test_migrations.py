@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+def legacy_sessions(count):
+    return [
+        {"_id": n, "id": f"s{n}", "date": "2026-03-14", "start_time": "19:00", "end_time": "21:00", "status": "upcoming"}
+        for n in range(1, count + 1)
+    ]
+
+
+def window_migration(transform):
+    return server.Migration(
+        99, "test_jam_session_window", "jam_sessions", {"starts_at": None}, transform, "test backfill"
+    )
+
+
+def test_interrupted_migration_resumes_from_its_checkpoint(mongo_db):
+    seen = []
+    crash_at = {3}
+
+    async def transform(doc):
+        if doc["_id"] in crash_at:
+            crash_at.clear()
+            raise RuntimeError("runner killed")
+        seen.append(doc["_id"])
+        return await server.migrate_jam_session_window(doc)
+
+    migration = window_migration(transform)
+
+    async def scenario():
+        await mongo_db.jam_sessions.insert_many(legacy_sessions(5))
+        with pytest.raises(RuntimeError):
+            await server.run_migration(migration, batch_size=2, rate_limit=1e9)
+        checkpoint = await mongo_db.migrations.find_one({"_id": migration.name})
+        assert (checkpoint["status"], checkpoint["last_id"], checkpoint["scanned"]) == ("running", 2, 2)
+
+        seen.clear()
+        result = await server.run_migration(migration, batch_size=2, rate_limit=1e9)
+        docs = await mongo_db.jam_sessions.find({"starts_at": None}).to_list(None)
+        return result, docs
+
+    result, unmigrated = asyncio.run(scenario())
+    # The second run starts after the checkpoint instead of rescanning migrated documents
+    assert seen == [3, 4, 5]
+    assert result == {"name": migration.name, "status": "completed", "scanned": 5, "migrated": 5}
+    assert unmigrated == []
+
+
+def test_completed_migration_is_not_rerun(mongo_db):
+    async def transform(doc):
+        raise AssertionError("completed migrations must not scan again")
+
+    migration = window_migration(server.migrate_jam_session_window)
+
+    async def scenario():
+        await mongo_db.jam_sessions.insert_many(legacy_sessions(1))
+        await server.run_migration(migration, rate_limit=1e9)
+        return await server.run_migration(window_migration(transform), rate_limit=1e9)
+
+    assert asyncio.run(scenario())["status"] == "completed"
+
+
+def test_migration_leased_elsewhere_is_left_alone(mongo_db):
+    migration = window_migration(server.migrate_jam_session_window)
+
+    async def scenario():
+        await mongo_db.jam_sessions.insert_many(legacy_sessions(1))
+        await mongo_db.migrations.insert_one({
+            "_id": migration.name,
+            "status": "running",
+            "owner": "other-host:1",
+            "lease_expires_at": server.datetime.now(server.timezone.utc) + server.timedelta(minutes=5),
+        })
+        result = await server.run_migration(migration, rate_limit=1e9)
+        remaining = await mongo_db.jam_sessions.count_documents({"starts_at": None})
+        return result, remaining
+
+    result, remaining = asyncio.run(scenario())
+    assert result == {"name": migration.name, "status": "running", "owner": "other-host:1"}
+    assert remaining == 1
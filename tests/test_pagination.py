@@ -0,0 +1,75 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+
+
+def test_cursor_round_trips_datetimes():
+    value = datetime(2026, 3, 14, 19, 0, tzinfo=timezone.utc)
+    cursor = server.encode_cursor({"id": "b", "starts_at": value}, "starts_at")
+    assert server.decode_cursor(cursor, "starts_at") == {"s": "starts_at", "v": value, "id": "b", "t": "datetime"}
+
+
+def test_missing_cursor_decodes_to_none():
+    assert server.decode_cursor(None, "created_at") is None
+    assert server.decode_cursor("", "created_at") is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(json.dumps({"s": "created_at", "v": "x"}).encode()).decode(),
+    # A cursor from a different sort order must not be applied to this one
+    base64.urlsafe_b64encode(json.dumps({"s": "starts_at", "v": "x", "id": "a"}).encode()).decode(),
+])
+def test_invalid_cursors_are_rejected_with_400(cursor):
+    with pytest.raises(server.HTTPException) as exc:
+        server.decode_cursor(cursor, "created_at")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_query_continues_after_the_last_row():
+    after = {"v": "2026-03-14", "id": "b"}
+    assert server.keyset_query({}, "created_at", None) == {}
+    assert server.keyset_query({}, "created_at", after) == {"$or": [
+        {"created_at": {"$gt": "2026-03-14"}},
+        {"created_at": "2026-03-14", "id": {"$gt": "b"}},
+    ]}
+    assert server.keyset_query({"status": "upcoming"}, "created_at", after) == {"$and": [
+        {"status": "upcoming"},
+        {"$or": [{"created_at": {"$gt": "2026-03-14"}}, {"created_at": "2026-03-14", "id": {"$gt": "b"}}]},
+    ]}
+
+
+def test_keyset_query_moves_past_missing_sort_values():
+    assert server.keyset_query({}, "starts_at", {"v": None, "id": "b"}) == {"$or": [
+        {"starts_at": None, "id": {"$gt": "b"}},
+        {"starts_at": {"$ne": None}},
+    ]}
+
+
+def test_paging_visits_every_document_once(mongo_db):
+    docs = [
+        {"id": "a", "starts_at": None},
+        {"id": "c", "starts_at": None},
+        {"id": "b", "starts_at": datetime(2026, 3, 1)},
+        {"id": "d", "starts_at": datetime(2026, 3, 1)},
+        {"id": "e", "starts_at": datetime(2026, 3, 2)},
+    ]
+
+    async def scenario():
+        await mongo_db.jam_sessions.insert_many(docs)
+        seen, cursor = [], None
+        while True:
+            after = server.decode_cursor(cursor, "starts_at")
+            page, cursor = await server.fetch_page(mongo_db.jam_sessions, {}, "starts_at", 2, after)
+            seen += [doc["id"] for doc in page]
+            if not cursor:
+                return seen
+
+    # Missing values first, then ascending, ties broken by id
+    assert asyncio.run(scenario()) == ["a", "c", "b", "d", "e"]
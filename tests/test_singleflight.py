@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+
+
+def test_concurrent_callers_share_one_execution():
+    async def run():
+        flights = server.SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "repos"
+
+        results = await asyncio.gather(*(flights.do("github", "repos", fetch) for _ in range(3)))
+        return results, calls, flights.snapshot()
+
+    results, calls, snapshot = asyncio.run(run())
+    assert results == ["repos"] * 3
+    assert len(calls) == 1
+    assert snapshot["namespaces"]["github"] == {"calls": 3, "executions": 1, "coalesced": 2}
+    assert snapshot["in_flight"] == 0
+
+
+def test_errors_are_shared_but_not_cached():
+    async def run():
+        flights = server.SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(*(flights.do("github", "repos", fetch) for _ in range(2)),
+                                       return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flights.do("github", "repos", fetch)
+        return results, calls
+
+    results, calls = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 2
+
+
+def test_last_waiter_cancelling_cancels_the_operation():
+    async def run():
+        flights = server.SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        caller = asyncio.ensure_future(flights.do("ai", "prompt", fetch))
+        await started.wait()
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return flights.snapshot()
+
+    assert asyncio.run(run())["in_flight"] == 0
+
+
+def test_other_waiters_keep_the_operation_alive():
+    async def run():
+        flights = server.SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "plan"
+
+        first = asyncio.ensure_future(flights.do("ai", "prompt", fetch))
+        second = asyncio.ensure_future(flights.do("ai", "prompt", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "plan"
+
+
+def test_caller_joining_during_cancel_starts_a_fresh_operation():
+    async def run():
+        flights = server.SingleFlight()
+        started = asyncio.Event()
+
+        async def slow_to_cancel():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.02)
+                raise
+
+        async def fetch():
+            return "fresh"
+
+        caller = asyncio.ensure_future(flights.do("ai", "prompt", slow_to_cancel))
+        await started.wait()
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        # The first task is still unwinding; a new caller must not inherit its cancellation
+        return await flights.do("ai", "prompt", fetch)
+
+    assert asyncio.run(run()) == "fresh"